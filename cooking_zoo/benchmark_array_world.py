@@ -0,0 +1,58 @@
+from cooking_zoo.cooking_world.actions import ActionScheme1, ActionScheme3
+from cooking_zoo.cooking_world.cooking_world import CookingWorld
+from cooking_zoo.cooking_world.engine.array_world import ArrayWorlds
+from cooking_zoo.cooking_world.engine.load_level import UTILS_DIR
+
+import numpy as np
+import random
+import time
+
+
+num_worlds = 256
+num_agents = 2
+num_steps = 100
+levels = sorted(path.stem for path in (UTILS_DIR / "level").glob("*.json"))
+
+
+def create_worlds(level, action_scheme):
+    # optional objects make resets of a level differ, a batch holds the worlds with the objects of the first one
+    worlds = []
+    objects = None
+    while len(worlds) < num_worlds:
+        world = CookingWorld(action_scheme, "example")
+        world.load_level(level, num_agents)
+        snapshot = world.snapshot()
+        if objects is None:
+            objects = (snapshot.type_names, snapshot.type_counts)
+        if (snapshot.type_names, snapshot.type_counts) == objects:
+            worlds.append(world)
+    return worlds
+
+
+def throughput(level, action_scheme):
+    random.seed(0)
+    np.random.seed(0)
+    worlds = create_worlds(level, action_scheme)
+    arrays = ArrayWorlds(worlds)
+    actions = np.random.RandomState(1).randint(len(action_scheme.ACTIONS), size=(num_steps, num_worlds, num_agents))
+
+    start = time.perf_counter()
+    for step_actions in actions:
+        for world, world_actions in zip(worlds, step_actions):
+            world.world_step(world_actions.tolist())
+    object_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for step_actions in actions:
+        arrays.step(step_actions)
+    array_seconds = time.perf_counter() - start
+    return num_steps * num_worlds / object_seconds, num_steps * num_worlds / array_seconds
+
+
+if __name__ == "__main__":
+    # step-for-step agreement of the two engines is tested in tests/test_array_world.py
+    print(f"{'level':<20} {'scheme':<14} {'objects steps/s':>16} {'arrays steps/s':>15}")
+    for level in levels:
+        for action_scheme in [ActionScheme1, ActionScheme3]:
+            object_rate, array_rate = throughput(level, action_scheme)
+            print(f"{level:<20} {action_scheme.__name__:<14} {object_rate:>16.0f} {array_rate:>15.0f}")
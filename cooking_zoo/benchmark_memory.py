@@ -0,0 +1,43 @@
+from cooking_zoo.cooking_world.engine.load_level import UTILS_DIR
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+
+import gc
+import tracemalloc
+
+
+num_envs = 64
+recipes = ["TomatoLettuceSalad", "CarrotBanana"]
+levels = sorted(path.stem for path in (UTILS_DIR / "level").glob("*.json"))
+
+
+def traced_bytes(create):
+    # the first instance loads level files, recipes and class level caches, only further instances are measured
+    keep = [create()]
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    keep.extend(create() for _ in range(num_envs))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size / num_envs
+
+
+def create_env(level):
+    env = CookingEnvironment(level, "example", len(recipes), 400, recipes, obs_spaces=["feature_vector"] * len(recipes))
+    env.reset()
+    return env
+
+
+def create_objects(level):
+    # the read-only objects of a reset world, as the symbolic observation hands them out, the env is dropped
+    return create_env(level).get_symbolic_view()
+
+
+if __name__ == "__main__":
+    print(f"{'level':<20} {'objects':>8} {'bytes per env':>14} {'bytes of objects':>17}")
+    for level in levels:
+        num_objects = sum(len(objects) for objects in create_objects(level).values())
+        env_bytes = traced_bytes(lambda: create_env(level))
+        object_bytes = traced_bytes(lambda: create_objects(level))
+        print(f"{level:<20} {num_objects:>8} {env_bytes:>14.0f} {object_bytes:>17.0f}")
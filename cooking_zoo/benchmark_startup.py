@@ -0,0 +1,57 @@
+import os
+import statistics
+import subprocess
+import sys
+
+
+repeats = 5
+
+# every measurement runs in a fresh interpreter, the snippets print the seconds they took
+imports = """
+import time
+start = time.perf_counter()
+import cooking_zoo.environment
+print(time.perf_counter() - start, 'pygame' in sys.modules)
+"""
+
+first_step = """
+import time
+start = time.perf_counter()
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+env = CookingEnvironment("coop_test", "example", 2, 400, ["TomatoLettuceSalad", "CarrotBanana"])
+env.reset()
+env.accumulated_step([0, 0])
+env.observe("player_0")
+print(time.perf_counter() - start, 'pygame' in sys.modules)
+"""
+
+first_frame = """
+import time
+start = time.perf_counter()
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+env = CookingEnvironment("coop_test", "example", 2, 400, ["TomatoLettuceSalad", "CarrotBanana"],
+                         render_mode="rgb_array")
+env.reset()
+env.accumulated_step([0, 0])
+env.render()
+print(time.perf_counter() - start, 'pygame' in sys.modules)
+"""
+
+
+def measure(snippet):
+    times = []
+    pygame_loaded = False
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", "import sys\n" + snippet], capture_output=True, text=True,
+                                check=True, env={"PYGAME_HIDE_SUPPORT_PROMPT": "hide", **os.environ})
+        seconds, loaded = output.stdout.split()[-2:]
+        times.append(float(seconds))
+        pygame_loaded = loaded == "True"
+    return statistics.median(times), pygame_loaded
+
+
+if __name__ == "__main__":
+    for name, snippet in [("import cooking_zoo.environment", imports), ("headless first step", first_step),
+                          ("first rgb_array frame", first_frame)]:
+        seconds, pygame_loaded = measure(snippet)
+        print(f"{name:<32} {seconds * 1000:8.1f} ms   pygame loaded: {pygame_loaded}")
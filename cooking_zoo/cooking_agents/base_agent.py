@@ -2,7 +2,11 @@ from cooking_zoo.cooking_book.recipe_drawer import RECIPES
 from cooking_zoo.cooking_world.world_objects import *
 import numpy as np
 from abc import abstractmethod
-from collections import deque
+from collections import deque, OrderedDict
+
+
+UNREACHABLE = np.iinfo(np.int32).max
+NEIGHBOURS = ((-1, 0), (1, 0), (0, 1), (0, -1))
 
 
 class CustomObject:
@@ -11,8 +15,78 @@ class CustomObject:
         self.world_objects = dictionary
 
 
+class DistanceFields:
+    """Walking distances to target cells over the floor tiles of one level layout.
+
+    Agents walk over floor tiles and may step onto the target itself, e.g. a counter. The distances of all floor tiles
+    to a target are computed with one BFS the first time the target is asked for and kept as a (width x height)
+    int32 array, UNREACHABLE marks tiles without a path. Fields can exclude a set of blocked floor tiles, e.g. the tiles
+    of other agents; they are cached per target and blocked set, so a plan is only recomputed when the blocked set
+    changes.
+    """
+
+    MAX_BLOCKED_FIELDS = 4096
+
+    def __init__(self, floor_tiles):
+        width = max((x for x, _ in floor_tiles), default=0) + 1
+        height = max((y for _, y in floor_tiles), default=0) + 1
+        self.walkable = np.zeros((width, height), dtype=bool)
+        for x, y in floor_tiles:
+            if x >= 0 and y >= 0:
+                self.walkable[x, y] = True
+        self.fields = {}
+        self.blocked_fields = {}
+
+    def is_floor(self, tile):
+        x, y = tile
+        return 0 <= x < self.walkable.shape[0] and 0 <= y < self.walkable.shape[1] and self.walkable[x, y]
+
+    def field(self, target, blocked=frozenset()):
+        fields = self.blocked_fields if blocked else self.fields
+        field = fields.get((target, blocked))
+        if field is None:
+            field = np.full(self.walkable.shape, UNREACHABLE, dtype=np.int32)
+            if self.is_floor(target):
+                field[target] = 0
+            queue = deque([(target, 0)])
+            while queue:
+                (x, y), steps = queue.popleft()
+                for dx, dy in NEIGHBOURS:
+                    tile = (x + dx, y + dy)
+                    if self.is_floor(tile) and field[tile] == UNREACHABLE and tile != target and tile not in blocked:
+                        field[tile] = steps + 1
+                        queue.append((tile, steps + 1))
+            if len(self.blocked_fields) >= self.MAX_BLOCKED_FIELDS:
+                self.blocked_fields.clear()
+            fields[(target, blocked)] = field
+        return field
+
+    def steps_from_floor(self, tile, target, blocked=frozenset()):
+        """Returns the distance of a floor tile to the target, UNREACHABLE for tiles that are no floor or blocked"""
+        if not self.is_floor(tile) or tile in blocked:
+            return UNREACHABLE
+        return int(self.field(target, blocked)[tile])
+
+    def steps(self, start, target, blocked=frozenset()):
+        """Returns the number of steps from start to target, start itself does not have to be a floor tile"""
+        if start == target:
+            return 0
+        best = UNREACHABLE
+        for dx, dy in NEIGHBOURS:
+            tile = (start[0] + dx, start[1] + dy)
+            steps = 0 if tile == target else self.steps_from_floor(tile, target, blocked)
+            if steps != UNREACHABLE:
+                best = min(best, steps + 1)
+        return best
+
+
 class BaseAgent:
 
+    # distance fields of the layouts seen last, shared by all agents and episodes. A layout is keyed by its floor tiles,
+    # which the level and its structure determine, the least recently used one is dropped beyond MAX_LAYOUTS
+    MAX_LAYOUTS = 8
+    distance_fields = OrderedDict()
+
     def __init__(self, recipe, name):
         # WALK_UP = 4
         # WALK_DOWN = 3
@@ -36,7 +110,8 @@ class BaseAgent:
         self.recipe_graph = RECIPES[recipe]()
         self.location = None
         self.agent = None
-        self.cache = {}
+        self.layout_observation = None
+        self.current_layout = None
 
     @abstractmethod
     def step(self, observation) -> int:
@@ -59,6 +134,22 @@ class BaseAgent:
                 self.location = agent.location
                 return
 
+    def layout(self, observation):
+        # the observation of a step is queried many times, the layout is looked up once per observation
+        if observation is not self.layout_observation:
+            floor_tiles = frozenset(tuple(floor.location) for floor in observation["Floor"])
+            layout = self.distance_fields.get(floor_tiles)
+            if layout is None:
+                layout = DistanceFields(floor_tiles)
+                self.distance_fields[floor_tiles] = layout
+                if len(self.distance_fields) > self.MAX_LAYOUTS:
+                    self.distance_fields.popitem(last=False)
+            else:
+                self.distance_fields.move_to_end(floor_tiles)
+            self.layout_observation = observation
+            self.current_layout = layout
+        return self.current_layout
+
     def walk_to_location(self, location, observation):
         start = tuple(self.location)
         goal = tuple(location)
@@ -66,64 +157,37 @@ class BaseAgent:
         if start == goal:
             return 0  # Stand still
 
-        visited = set()
-        queue = deque([(start, [])])
-
-        floor_tiles = set(tuple(floor.location) for floor in observation["Floor"])
-
-        while queue:
-            current, path = queue.popleft()
-            if current == goal:
-                if path:
-                    next_step = path[0]
-                    for action, delta in self.action_dict.items():
-                        if tuple(np.add(start, delta)) == next_step:
-                            return action
-                return 0  # Stand still if path is empty (should not happen as we check start == goal initially)
-
-            visited.add(current)
+        layout = self.layout(observation)
+        blocked = self.blocked_tiles(observation)
+        steps = layout.steps(start, goal, blocked)
+        if steps == UNREACHABLE and blocked:
+            # there is no way around the blocked tiles, follow the free path and wait for them to clear
+            blocked = frozenset()
+            steps = layout.steps(start, goal)
+        if steps == UNREACHABLE:
+            return 0  # Stand still
+        # the first step of a shortest path, ties are broken in the order of the actions
+        reserved = self.reserved_tiles(observation)
+        for action, delta in self.action_dict.items():
+            next_tile = (start[0] + int(delta[0]), start[1] + int(delta[1]))
+            if next_tile in reserved:
+                continue
+            if next_tile == goal or layout.steps_from_floor(next_tile, goal, blocked) == steps - 1:
+                return action
+        return 0
 
-            for action, delta in self.action_dict.items():
-                next_tile = tuple(np.add(current, delta))
-                if next_tile not in visited and (next_tile in floor_tiles or next_tile == goal):
-                    queue.append((next_tile, path + [next_tile]))
+    def blocked_tiles(self, observation):
+        """Returns the floor tiles to plan around, the base agent only plans over the level layout"""
+        return frozenset()
 
-        # If there's no path found
-        return 0  # Stand still
+    def reserved_tiles(self, observation):
+        """Returns the tiles the agent must not step on in its next step"""
+        return frozenset()
 
     def reachable(self, location1, location2, observation):
-        if (location1, location2) in self.cache or (location2, location1) in self.cache:
-            return self.cache[(location1, location2)]
-
         if location1 == location2:
-            self.cache[(location1, location2)] = True
-            self.cache[(location2, location1)] = True
             return True
-
-        visited = set()
-        queue = deque([location1])
-
-        floor_tiles = set(tuple(floor.location) for floor in observation["Floor"])
-
-        while queue:
-            current = queue.popleft()
-
-            if current == location2:
-                self.cache[(location1, location2)] = True
-                self.cache[(location2, location1)] = True
-                return True
-
-            visited.add(current)
-
-            # Iterate over all possible moves (up, down, left, right)
-            for delta in [np.array([-1, 0]), np.array([1, 0]), np.array([0, 1]), np.array([0, -1])]:
-                next_tile = tuple(np.add(current, delta))
-                if next_tile not in visited and (next_tile in floor_tiles or next_tile == location2):
-                    queue.append(next_tile)
-
-        self.cache[(location1, location2)] = False
-        self.cache[(location2, location1)] = False
-        return False
+        return self.layout(observation).steps(tuple(location1), tuple(location2)) != UNREACHABLE
 
     def closest(self, location, locations, observation):
         closest = None
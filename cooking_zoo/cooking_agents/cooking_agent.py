@@ -1,10 +1,18 @@
-from cooking_zoo.cooking_agents.base_agent import BaseAgent, CustomObject
+from cooking_zoo.cooking_agents.base_agent import BaseAgent, CustomObject, NEIGHBOURS
 
 
 class CookingAgent(BaseAgent):
+    """Heuristic agent that works through the nodes of its recipe.
+
+    Other agents are treated as obstacles: paths lead around the tiles they stand on and are only replanned when one of
+    them moves. When two agents competed for the same tile in the last step, the agent whose name sorts later keeps
+    off the tiles the others can step on next, and agents without anything left to do make way for agents next to
+    them.
+    """
 
     def __init__(self, recipe, name):
         super().__init__(recipe, name)
+        self.last_move = None
 
     def step(self, observation):
         self.update_location(observation)
@@ -12,10 +20,51 @@ class CookingAgent(BaseAgent):
         self.recipe_graph.update_recipe_state(world)
         node = self.find_node()
         if not node:
-            return 0
-        action = self.compute_optimal_action(node, observation)
+            action = self.make_way(observation)
+        else:
+            action = self.compute_optimal_action(node, observation)
+        self.last_move = (self.location, action)
         return action
 
+    def other_agents(self, observation):
+        return [agent for agent in observation["Agent"] if agent.name != self.name]
+
+    def blocked_tiles(self, observation):
+        return frozenset(tuple(agent.location) for agent in self.other_agents(observation))
+
+    def reserved_tiles(self, observation):
+        if not self.collided(observation):
+            return frozenset()
+        return frozenset((agent.location[0] + dx, agent.location[1] + dy)
+                         for agent in self.other_agents(observation) if agent.name < self.name
+                         for dx, dy in NEIGHBOURS)
+
+    def collided(self, observation):
+        # a step onto a floor tile that left the agent in place was turned into a no-op by a collision
+        if self.last_move is None or self.last_move[1] not in (1, 2, 3, 4):
+            return False
+        location, action = self.last_move
+        delta = self.action_dict[action]
+        target = (location[0] + int(delta[0]), location[1] + int(delta[1]))
+        return tuple(self.location) == tuple(location) and self.layout(observation).is_floor(target)
+
+    def make_way(self, observation):
+        others = [tuple(agent.location) for agent in self.other_agents(observation)]
+        if not any(self.distance(self.location, other) == 1 for other in others):
+            return 0
+        layout = self.layout(observation)
+        best_action = 0
+        best_distance = min(self.distance(self.location, other) for other in others)
+        for action, delta in self.action_dict.items():
+            tile = (self.location[0] + int(delta[0]), self.location[1] + int(delta[1]))
+            if not layout.is_floor(tile) or tile in others:
+                continue
+            distance = min(self.distance(tile, other) for other in others)
+            if distance > best_distance:
+                best_action = action
+                best_distance = distance
+        return best_action
+
     def compute_optimal_action(self, node, observation):
         condition_based_action = self.compute_condition_action(node, observation)
         if condition_based_action:
@@ -1,7 +1,16 @@
 from cooking_zoo.cooking_world.cooking_world import CookingWorld
 from enum import Enum
+from collections import defaultdict, namedtuple
 
 import numpy as np
+import copy
+
+
+# Flat description of a recipe tree. Nodes are indexed in order of their first appearance in the node list of the
+# recipe (the root node has index 0); contains holds the indices of the contained nodes, parents the index of the parent
+# node or -1 and node_order the node list of the recipe as indices.
+CompiledRecipe = namedtuple("CompiledRecipe", ["root_types", "id_nums", "names", "conditions", "contains", "parents",
+                                               "objects_to_seek", "node_order", "num_goals"])
 
 
 class NodeTypes(Enum):
@@ -29,15 +38,80 @@ class RecipeNode:
 class Recipe:
 
     def __init__(self, root_node: RecipeNode, num_goals: int):
+        self.init_nodes(root_node, [root_node] + self.expand_child_nodes(root_node), num_goals)
+
+    @classmethod
+    def from_compiled(cls, compiled_recipe: CompiledRecipe):
+        nodes = [RecipeNode(root_type, id_num, name, conditions=list(conditions), objects_to_seek=list(objects_to_seek))
+                 for root_type, id_num, name, conditions, objects_to_seek in
+                 zip(compiled_recipe.root_types, compiled_recipe.id_nums.tolist(), compiled_recipe.names,
+                     compiled_recipe.conditions, compiled_recipe.objects_to_seek)]
+        for node, contains, parent in zip(nodes, compiled_recipe.contains, compiled_recipe.parents.tolist()):
+            node.contains = [nodes[idx] for idx in contains]
+            node.parent = nodes[parent] if parent >= 0 else None
+        recipe = cls.__new__(cls)
+        recipe.init_nodes(nodes[0], [nodes[idx] for idx in compiled_recipe.node_order.tolist()],
+                          compiled_recipe.num_goals)
+        return recipe
+
+    def init_nodes(self, root_node: RecipeNode, node_list, num_goals: int):
         self.root_node = root_node
-        self.node_list = [root_node] + self.expand_child_nodes(root_node)
-        self.goal_encoding = self.goals_completed(num_goals)
+        self.node_list = node_list
+        self.num_goals = num_goals
+        self.id_nums = np.asarray([node.id_num for node in node_list], dtype=np.int64)
+        self.goals = None
+        self.goals_view = None
+        self.num_open_goals = 0
+        self.refresh_goals(num_goals)
+        self.goal_encoding = self.goals_completed(num_goals).copy()
+        self.evaluator = RecipeStateEvaluator(self.node_list)
 
-    def goals_completed(self, num_goals):
-        goals = np.zeros(num_goals, dtype=np.int32)
+    def compile(self):
+        node_indices = {}
         for node in self.node_list:
-            goals[node.id_num] = int(not node.marked)
-        return goals
+            node_indices.setdefault(node, len(node_indices))
+        nodes = list(node_indices)
+        return CompiledRecipe(tuple(node.root_type for node in nodes),
+                              np.asarray([node.id_num for node in nodes], dtype=np.int64),
+                              tuple(node.name for node in nodes),
+                              tuple(tuple(node.conditions) for node in nodes),
+                              tuple(tuple(node_indices[contains] for contains in node.contains) for node in nodes),
+                              np.asarray([node_indices.get(node.parent, -1) for node in nodes], dtype=np.int64),
+                              tuple(tuple(node.child_nodes) for node in nodes),
+                              np.asarray([node_indices[node] for node in self.node_list], dtype=np.int64),
+                              self.num_goals)
+
+    @staticmethod
+    def read_only_view(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def goals_completed(self, num_goals):
+        # the returned view is owned by the recipe and changes with the state of the recipe
+        if self.goals.shape[0] != num_goals:
+            self.refresh_goals(num_goals)
+        return self.goals_view
+
+    def refresh_goals(self, num_goals):
+        self.goals = np.zeros(num_goals, dtype=np.int32)
+        self.goals_view = self.read_only_view(self.goals)
+        self.goals[self.id_nums] = [not node.marked for node in self.node_list]
+        self.num_open_goals = int(self.goals.sum())
+
+    def update_goal(self, node: RecipeNode):
+        # keeps the goal array and the number of open goals in sync with the mark of the node
+        open_goal = int(not node.marked)
+        previous_open_goal = int(self.goals[node.id_num])
+        if open_goal != previous_open_goal:
+            self.goals[node.id_num] = open_goal
+            self.num_open_goals += open_goal - previous_open_goal
+
+    def restore_marks(self, marks):
+        for node, marked in zip(self.node_list, marks):
+            node.marked = marked
+            node.world_objects = []
+        self.refresh_goals(self.goals.shape[0])
 
     def get_objects_to_seek(self):
         objects_to_seek = set()
@@ -75,16 +149,12 @@ class Recipe:
         return self.root_node.marked
 
     def update_recipe_state(self, world: CookingWorld):
-        for node in reversed(self.node_list):
-            node.marked = False
-            node.world_objects = []
-            if not all((contains.marked for contains in node.contains)):
-                continue
-            for obj in world.world_objects[node.name]:
-                # check for all conditions
-                if self.check_conditions(node, obj):
-                    node.world_objects.append(obj)
-                    node.marked = True
+        for node in self.evaluator.update(world):
+            self.update_goal(node)
+
+    def evaluate_all_nodes(self, world: CookingWorld):
+        for node in self.evaluator.evaluate_all_nodes(world):
+            self.update_goal(node)
 
     def expand_child_nodes(self, node: RecipeNode):
         child_nodes = []
@@ -92,13 +162,113 @@ class Recipe:
             child_nodes.extend(self.expand_child_nodes(child))
         return node.contains + child_nodes
 
+
+class RecipeStateEvaluator:
+    """Evaluates a list of recipe nodes, given parents before the nodes they contain, against a world.
+
+    Nodes only depend on the objects of their own type and on the results of the nodes they contain. With an object
+    tracker, only nodes whose object type changed since the last update, and the nodes containing them, are evaluated
+    again. Other worlds (e.g. observations of agents) always evaluate all nodes.
+    """
+
+    def __init__(self, node_list):
+        self.node_list = node_list
+        self.tracker = None
+        self.change_set = None
+        self.structure_version = -1
+
+    def __getstate__(self):
+        # pickles are detached from the tracker, they evaluate all nodes on their next update
+        state = self.__dict__.copy()
+        state["tracker"] = None
+        state["change_set"] = None
+        return state
+
+    def __deepcopy__(self, memo):
+        # deep copies keep following the copy of the tracker, which is copied through the memo with its change sets
+        evaluator = type(self).__new__(type(self))
+        memo[id(self)] = evaluator
+        evaluator.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return evaluator
+
+    def update(self, world: CookingWorld):
+        """Updates the nodes and returns the nodes that were evaluated, contained nodes first."""
+        tracker = getattr(world, "object_tracker", None)
+        if tracker is None:
+            self.tracker = None
+            return self.evaluate_all_nodes(world)
+        if tracker is not self.tracker or tracker.structure_version != self.structure_version:
+            if tracker is not self.tracker:
+                self.tracker = tracker
+                self.change_set = tracker.register_change_set()
+            self.structure_version = tracker.structure_version
+            self.change_set.clear()
+            return self.evaluate_all_nodes(world)
+        changed_types = {type(obj).__name__ for obj in self.change_set}
+        self.change_set.clear()
+        evaluated_nodes = []
+        evaluated_set = set()
+        for node in reversed(self.node_list):
+            if node.name in changed_types or any(contains in evaluated_set for contains in node.contains):
+                self.evaluate_node(node, world)
+                evaluated_nodes.append(node)
+                evaluated_set.add(node)
+        return evaluated_nodes
+
+    def evaluate_all_nodes(self, world: CookingWorld):
+        evaluated_nodes = list(reversed(self.node_list))
+        for node in evaluated_nodes:
+            self.evaluate_node(node, world)
+        return evaluated_nodes
+
     @staticmethod
-    def check_conditions(node: RecipeNode, world_object):
-        for condition in node.conditions:
-            if getattr(world_object, condition[0]) != condition[1]:
-                return False
-        else:
-            all_contained = []
-            for contains in node.contains:
-                all_contained.append(any([obj.location == world_object.location for obj in contains.world_objects]))
-            return all(all_contained)
+    def evaluate_node(node: RecipeNode, world: CookingWorld):
+        node.marked = False
+        node.world_objects = []
+        if not all((contains.marked for contains in node.contains)):
+            return
+        contained_locations = [{obj.location for obj in contains.world_objects} for contains in node.contains]
+        for obj in world.world_objects[node.name]:
+            # check for all conditions
+            if all(getattr(obj, condition[0]) == condition[1] for condition in node.conditions) and \
+                    all(obj.location in locations for locations in contained_locations):
+                node.world_objects.append(obj)
+                node.marked = True
+
+
+class SharedRecipeEvaluator:
+    """Evaluates several recipes at once on a DAG in which identical nodes of all recipes are merged.
+
+    Two nodes are identical if they seek the same object type under the same conditions and contain identical nodes,
+    e.g. the chopped tomato of every tomato plate. Every merged node is evaluated once per update and its result is
+    copied to the nodes of the recipes it stands for.
+    """
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        # recipe nodes represented by each shared node, as (recipe, node) pairs
+        self.recipe_nodes = defaultdict(list)
+        shared_nodes = {}
+        node_keys = {}
+        evaluation_order = []
+        for recipe in recipes:
+            for node in reversed(recipe.node_list):
+                if node in node_keys:
+                    continue
+                key = (node.name, tuple(node.conditions), tuple(node_keys[contains] for contains in node.contains))
+                node_keys[node] = key
+                if key not in shared_nodes:
+                    shared_nodes[key] = RecipeNode(node.root_type, node.id_num, node.name,
+                                                   conditions=node.conditions,
+                                                   contains=[shared_nodes[node_keys[contains]]
+                                                             for contains in node.contains])
+                    evaluation_order.append(shared_nodes[key])
+                self.recipe_nodes[shared_nodes[key]].append((recipe, node))
+        self.evaluator = RecipeStateEvaluator(list(reversed(evaluation_order)))
+
+    def update_recipe_states(self, world: CookingWorld):
+        for shared_node in self.evaluator.update(world):
+            for recipe, node in self.recipe_nodes[shared_node]:
+                node.marked = shared_node.marked
+                node.world_objects = shared_node.world_objects
+                recipe.update_goal(node)
@@ -1,6 +1,6 @@
 from cooking_zoo.cooking_world.world_objects import *
 from cooking_zoo.cooking_book.recipe import Recipe, RecipeNode
-from copy import deepcopy
+from functools import partial
 
 
 def id_num_generator():
@@ -32,7 +32,7 @@ def get_next_default_id():
 
 
 def register_recipe(recipe, name):
-    RECIPE_STORE[name] = lambda: deepcopy(recipe)
+    RECIPE_STORE[name] = partial(Recipe.from_compiled, recipe.compile())
     
 
 #  Basic food Items
@@ -106,13 +106,14 @@ floor = RecipeNode(root_type=Floor, id_num=get_next_default_id(), name="Floor",
 no_recipe_node = RecipeNode(root_type=Deliversquare, id_num=get_next_default_id(), name='Deliversquare', conditions=None,
                             contains=[floor])
 
-RECIPES = {"TomatoSalad": lambda: deepcopy(Recipe(TomatoSalad, DEFAULT_NUM_GOALS)),
-           "TomatoLettuceSalad": lambda: deepcopy(Recipe(TomatoLettuceSalad, DEFAULT_NUM_GOALS)),
-           "CarrotBanana": lambda: deepcopy(Recipe(CarrotBanana, DEFAULT_NUM_GOALS)),
-           "MashedCarrotBanana": lambda: deepcopy(Recipe(MashedCarrotBanana, DEFAULT_NUM_GOALS)),
-           "CucumberOnion": lambda: deepcopy(Recipe(CucumberOnion, DEFAULT_NUM_GOALS)),
-           "AppleWatermelon": lambda: deepcopy(Recipe(AppleWatermelon, DEFAULT_NUM_GOALS)),
-           "TomatoLettuceOnionSalad": lambda: deepcopy(Recipe(TomatoLettuceOnionSalad, DEFAULT_NUM_GOALS)),
-           # "MashedCarrot": lambda: deepcopy(Recipe(MashedCarrot)),
-           "no_recipe": lambda: deepcopy(Recipe(no_recipe_node, DEFAULT_NUM_GOALS))
-           }
+# recipes are compiled once, every call of a RECIPES entry instantiates fresh nodes from the compiled recipe
+RECIPES = {name: partial(Recipe.from_compiled, Recipe(root_node, DEFAULT_NUM_GOALS).compile())
+           for name, root_node in [("TomatoSalad", TomatoSalad),
+                                   ("TomatoLettuceSalad", TomatoLettuceSalad),
+                                   ("CarrotBanana", CarrotBanana),
+                                   ("MashedCarrotBanana", MashedCarrotBanana),
+                                   ("CucumberOnion", CucumberOnion),
+                                   ("AppleWatermelon", AppleWatermelon),
+                                   ("TomatoLettuceOnionSalad", TomatoLettuceOnionSalad),
+                                   # ("MashedCarrot", MashedCarrot),
+                                   ("no_recipe", no_recipe_node)]}
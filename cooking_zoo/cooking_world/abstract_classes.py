@@ -2,13 +2,39 @@ from abc import abstractmethod, ABC
 from cooking_zoo.cooking_world.constants import *
 from typing import List, Tuple
 import inspect
+import copy
 import sys
 
 
+# A level holds one object per tile, so the game objects keep their attributes in __slots__ instead of a __dict__.
+# Only one base of a class may add slots to the instance layout: Object, StaticObject and DynamicObject declare theirs,
+# the mixins below declare empty __slots__ and list the attributes they set in mixin_slots. Concrete game classes add
+# the slots of their mixins with __slots__ = mixin_slots(<bases>).
+SLOT_NAMES = {}
+EMPTY_CONTENT = ()
+
+
+def mixin_slots(*bases):
+    return tuple(dict.fromkeys(slot for base in bases for cls in reversed(base.__mro__)
+                               for slot in cls.__dict__.get("mixin_slots", ())))
+
+
+def slot_names(cls):
+    names = SLOT_NAMES.get(cls)
+    if names is None:
+        names = tuple(dict.fromkeys(slot for base in reversed(cls.__mro__)
+                                    for slot in base.__dict__.get("__slots__", ())
+                                    if slot not in ("__dict__", "__weakref__")))
+        SLOT_NAMES[cls] = names
+    return names
+
+
 class Object(ABC):
+    __slots__ = ("tracker", "unique_id", "_location", "movable")
 
     def __init__(self, unique_id, location, movable, walkable):
         super(Object, self).__init__()
+        self.tracker = None  # object tracker of the world this object is placed in
         self.unique_id = unique_id
         self._location = location
         self.movable = movable  # you can pick this one up
@@ -27,7 +53,50 @@ class Object(ABC):
     @location.setter
     def location(self, new_location):
         assert new_location is not None
+        old_location = self._location
         self._location = new_location
+        if self.tracker is not None:
+            self.tracker.object_moved(self, old_location, new_location)
+
+    def mark_changed(self):
+        # reports a state change that is not a location change to the tracker
+        if self.tracker is not None:
+            self.tracker.object_changed(self)
+
+    def mark_dirty(self):
+        # asks the world to process this object, e.g. after its content changed, in the next progress_world
+        if self.tracker is not None:
+            self.tracker.object_dirty(self)
+
+    def attributes(self) -> dict:
+        """Returns the instance attributes by name, the slots that are set and the __dict__ of unslotted subclasses"""
+        attributes = {}
+        for attr in slot_names(type(self)):
+            try:
+                attributes[attr] = getattr(self, attr)
+            except AttributeError:
+                # slot that was never set
+                pass
+        attributes.update(getattr(self, "__dict__", {}))
+        return attributes
+
+    def __getstate__(self):
+        # pickled objects are detached from the tracker, the owning world re-tracks its objects
+        state = self.attributes()
+        state["tracker"] = None
+        return state
+
+    def __deepcopy__(self, memo):
+        # deep copies keep their tracker, it is copied once through the memo together with the rest of the world
+        obj = type(self).__new__(type(self))
+        memo[id(self)] = obj
+        for attr, value in self.attributes().items():
+            setattr(obj, attr, copy.deepcopy(value, memo))
+        return obj
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
 
     @property
     def physical_state(self):
@@ -93,6 +162,8 @@ class Object(ABC):
 
 
 class ActionObject(ABC):
+    __slots__ = ()
+    mixin_slots = ("status",)
 
     def __init__(self):
         super(ActionObject, self).__init__()
@@ -104,6 +175,8 @@ class ActionObject(ABC):
 
 
 class ToggleObject(ABC):
+    __slots__ = ()
+    mixin_slots = ("toggle",)
 
     def __init__(self, toggle=False):
         super(ToggleObject, self).__init__()
@@ -111,9 +184,13 @@ class ToggleObject(ABC):
 
     def switch_toggle(self):
         self.toggle = not self.toggle
+        self.mark_changed()
+        self.mark_dirty()
 
 
 class TemperatureObject:
+    __slots__ = ()
+    mixin_slots = ("temperature",)
 
     def __init__(self):
         super(TemperatureObject, self).__init__()
@@ -125,6 +202,7 @@ class TemperatureObject:
 
 
 class ProcessingObject(ABC):
+    __slots__ = ()
 
     def __init__(self):
         super(ProcessingObject, self).__init__()
@@ -135,6 +213,8 @@ class ProcessingObject(ABC):
 
 
 class LinkedObject(ABC):
+    __slots__ = ()
+    mixin_slots = ("linked_objects", "linked_group_id")
 
     def __init__(self):
         super(LinkedObject, self).__init__()
@@ -160,6 +240,7 @@ class LinkedObject(ABC):
 
 
 class ProgressingObject(ABC):
+    __slots__ = ()
 
     def __init__(self):
         super(ProgressingObject, self).__init__()
@@ -170,12 +251,39 @@ class ProgressingObject(ABC):
 
 
 class ContentObject:
+    __slots__ = ()
+    mixin_slots = ("_content", "max_content")
 
     def __init__(self, max_content=1):
         super(ContentObject, self).__init__()
-        self.content = []
+        # most tiles never hold anything, their content list is only allocated when the first object is put on them
+        self._content = None
         self.max_content = max_content
 
+    @property
+    def content(self):
+        return EMPTY_CONTENT if self._content is None else self._content
+
+    @content.setter
+    def content(self, content):
+        self._content = content or None
+        self.mark_dirty()
+
+    def put_content(self, content):
+        if self._content is None:
+            self._content = []
+        self._content.append(content)
+        self.mark_dirty()
+
+    def remove_content(self, content):
+        self._content.remove(content)
+        self.mark_dirty()
+
+    def pop_content(self):
+        content = self._content.pop(-1)
+        self.mark_dirty()
+        return content
+
     @property
     def notFull(self):
         return len(self.content) < self.max_content
@@ -198,6 +306,7 @@ class ContentObject:
 
 
 class Food:
+    __slots__ = ()
 
     def __init__(self):
         super(Food, self).__init__()
@@ -208,6 +317,7 @@ class Food:
 
 
 class StaticObject(Object, ABC):
+    __slots__ = ("_walkable",)
 
     def __init__(self, unique_id, location, walkable):
         super().__init__(unique_id, location, False, walkable)
@@ -215,6 +325,16 @@ class StaticObject(Object, ABC):
     def move_to(self, new_location):
         raise Exception(f"Can't move static object {self.name()}")
 
+    @property
+    def walkable(self):
+        return self._walkable
+
+    @walkable.setter
+    def walkable(self, walkable):
+        self._walkable = walkable
+        if self.tracker is not None:
+            self.tracker.walkability_changed(self)
+
     @abstractmethod
     def accepts(self, dynamic_objects) -> bool:
         pass
@@ -225,6 +345,7 @@ class StaticObject(Object, ABC):
 
 
 class DynamicObject(Object, ABC):
+    __slots__ = ("walkable", "free")
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location, True, False)
@@ -232,6 +353,8 @@ class DynamicObject(Object, ABC):
 
 
 class TemperatureFood(DynamicObject, Food, TemperatureObject, ABC):
+    __slots__ = ()
+    mixin_slots = ("current_progress", "max_progress", "min_progress", "food_state")
 
     def __init__(self, food_state):
         super(TemperatureFood, self).__init__()
@@ -242,6 +365,8 @@ class TemperatureFood(DynamicObject, Food, TemperatureObject, ABC):
 
 
 class ChopFood(DynamicObject, Food, ABC):
+    __slots__ = ()
+    mixin_slots = ("chop_state",)
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location)
@@ -251,10 +376,13 @@ class ChopFood(DynamicObject, Food, ABC):
         if self.chop_state == ChopFoodStates.CHOPPED:
             return [], [], False
         self.chop_state = ChopFoodStates.CHOPPED
+        self.mark_changed()
         return [], [], True
 
 
 class BlenderFood(DynamicObject, Food, ABC):
+    __slots__ = ()
+    mixin_slots = ("current_progress", "max_progress", "min_progress", "blend_state")
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location)
@@ -270,10 +398,13 @@ class BlenderFood(DynamicObject, Food, ABC):
             self.current_progress -= 1
             self.blend_state = BlenderFoodStates.IN_PROGRESS if self.current_progress > self.max_progress \
                 else BlenderFoodStates.MASHED
+            self.mark_changed()
         return True
 
 
 class ToasterFood(DynamicObject, Food, ABC):
+    __slots__ = ()
+    mixin_slots = ("current_progress", "max_progress", "min_progress", "toast_state")
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location)
@@ -287,11 +418,14 @@ class ToasterFood(DynamicObject, Food, ABC):
             self.current_progress -= 1
             self.toast_state = ToasterFoodStates.IN_PROGRESS if self.current_progress > self.max_progress \
                 else ToasterFoodStates.TOASTED
+            self.mark_changed()
             return True
         return False
 
 
 class MicrowaveFood(DynamicObject, Food, ABC):
+    __slots__ = ()
+    mixin_slots = ("current_progress", "max_progress", "min_progress", "microwave_state")
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location)
@@ -305,11 +439,14 @@ class MicrowaveFood(DynamicObject, Food, ABC):
             self.current_progress -= 1
             self.microwave_state = MicrowaveFoodStates.IN_PROGRESS if self.current_progress > self.max_progress \
                 else MicrowaveFoodStates.HOT
+            self.mark_changed()
             return True
         return False
 
 
 class PotFood(DynamicObject, Food, ABC):
+    __slots__ = ()
+    mixin_slots = ("current_progress", "max_progress", "min_progress", "boil_state")
 
     def __init__(self, unique_id, location):
         super().__init__(unique_id, location)
@@ -323,6 +460,7 @@ class PotFood(DynamicObject, Food, ABC):
             self.current_progress -= 1
             self.boil_state = PotFoodStates.IN_PROGRESS if self.current_progress > self.max_progress \
                 else PotFoodStates.COOKED
+            self.mark_changed()
             return True
         return False
 
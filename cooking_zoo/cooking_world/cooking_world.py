@@ -2,8 +2,10 @@ from collections import defaultdict
 from cooking_zoo.cooking_world.world_objects import *
 from cooking_zoo.cooking_world.actions import *
 from cooking_zoo.cooking_world.cooking_action_util import action_scheme1, action_scheme2, action_scheme3
-from cooking_zoo.cooking_world.engine import load_level, parsing
+from cooking_zoo.cooking_world.engine import load_level, parsing, snapshot
+from cooking_zoo.cooking_world.engine.object_tracker import ObjectTracker
 import numpy as np
+import copy
 
 
 class CookingWorld:
@@ -28,10 +30,11 @@ class CookingWorld:
         self.width = 0
         self.height = 0
         self.world_objects = defaultdict(list)
-        self.abstract_index = defaultdict(list)
+        self.object_tracker = ObjectTracker(self.world_objects)
+        # abstract class -> objects of the world, the keys of a dict keep insertion order and remove in O(1)
+        self.abstract_index = defaultdict(dict)
         self.action_scheme = action_scheme_class
         self.init_world = None
-        self.init_agents = []
         self.meta_object_information = load_level.load_meta_file(meta_file)
         self.loaded_object_counter = defaultdict(int)
         self.recipes = recipes or []
@@ -43,30 +46,50 @@ class CookingWorld:
         self.status_changed = []
         self.relevant_agents = []
 
+    def __getstate__(self):
+        # pickles leave out the tracker and re-track the objects on load
+        state = self.__dict__.copy()
+        del state["object_tracker"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.track_objects()
+
+    def __deepcopy__(self, memo):
+        # deep copies copy the tracker through the memo instead of rebuilding it
+        world = type(self).__new__(type(self))
+        memo[id(self)] = world
+        world.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return world
+
     def add_object(self, obj):
         self.world_objects[type(obj).__name__].append(obj)
+        self.object_tracker.add(obj)
 
     def delete_object(self, obj):
         self.world_objects[type(obj).__name__].remove(obj)
+        self.object_tracker.remove(obj)
+
+    def track_objects(self):
+        self.object_tracker = ObjectTracker(self.world_objects)
+        for obj_list in self.world_objects.values():
+            for obj in obj_list:
+                self.object_tracker.add(obj)
+        self.object_tracker.build_walkable_grid(self.width, self.height)
 
     def index_objects(self):
         for type_name, obj_list in self.world_objects.items():
-            for abstract_class in ABSTRACT_GAME_CLASSES:
-                if issubclass(StringToClass[type_name], abstract_class):
-                    self.abstract_index[abstract_class].extend(obj_list)
+            for abstract_class in AbstractClasses[StringToClass[type_name]]:
+                self.abstract_index[abstract_class].update(dict.fromkeys(obj_list))
 
     def delete_from_index(self, obj):
-        for abstract_class in ABSTRACT_GAME_CLASSES:
-            if isinstance(obj, abstract_class):
-                try:
-                    self.abstract_index[abstract_class].remove(obj)
-                except ValueError:
-                    pass
+        for abstract_class in AbstractClasses[type(obj)]:
+            self.abstract_index[abstract_class].pop(obj, None)
 
     def add_to_index(self, obj):
-        for abstract_class in ABSTRACT_GAME_CLASSES:
-            if isinstance(obj, abstract_class):
-                self.abstract_index[abstract_class].append(obj)
+        for abstract_class in AbstractClasses[type(obj)]:
+            self.abstract_index[abstract_class][obj] = None
 
     def get_object_list(self):
         object_list = []
@@ -75,12 +98,16 @@ class CookingWorld:
         return object_list
 
     def progress_world(self):
-        for obj in self.abstract_index[ProcessingObject]:
-            obj.process()
+        # only objects marked dirty since the last step, i.e. running processors and containers whose content changed,
+        # can change here, the free flags of all other content are up to date
+        dirty_objects = self.object_tracker.take_dirty_objects()
+        for obj in dirty_objects:
+            if isinstance(obj, ProcessingObject):
+                obj.process()
         for obj in self.abstract_index[ProgressingObject]:
             obj.progress()
-        for obj in self.abstract_index[ContentObject]:
-            if len(obj.content) > 0:
+        for obj in dirty_objects:
+            if isinstance(obj, ContentObject) and len(obj.content) > 0:
                 for c in obj.content:
                     if hasattr(c, "free"):
                         c.free = False
@@ -130,7 +157,7 @@ class CookingWorld:
                         break
                 if object_to_grab in static_object.content:
                     agent.grab(object_to_grab)
-                    static_object.content.remove(object_to_grab)
+                    static_object.remove_content(object_to_grab)
                     agent.interacts_with = [object_to_grab]
         elif agent.holding:
             self.attempt_merge(agent, dynamic_objects, interaction_location, static_object)
@@ -143,11 +170,8 @@ class CookingWorld:
         if not agent.holding and dynamic_objects:
             content_obj_l = self.filter_obj(dynamic_objects, ContentObject)
             if len(content_obj_l) == 1:
-                try:
-                    obj = content_obj_l[0].content.pop(-1)  # pick the last object put on
-                    agent.grab(obj)
-                except IndexError:
-                    pass
+                if content_obj_l[0].content:
+                    agent.grab(content_obj_l[0].pop_content())  # pick the last object put on
             else:
                 return
         else:
@@ -190,26 +214,26 @@ class CookingWorld:
         return [obj for obj in objects if isinstance(obj, obj_type)]
 
     def check_inbounds(self, agents, actions):
+        width, height = self.object_tracker.walkable_grid.shape
         cleaned_actions = []
         for agent, action in zip(agents, actions):
             if action == 0 or action == 5:
                 cleaned_actions.append(action)
                 continue
             target_location = self.get_target_location(agent, action)
-            if target_location[0] > self.width - 1 or target_location[0] < 0:
-                action = 0
-            if target_location[1] > self.height - 1 or target_location[1] < 0:
+            if not (0 <= target_location[0] < width and 0 <= target_location[1] < height):
                 action = 0
             cleaned_actions.append(action)
         return cleaned_actions
 
     def check_collisions(self, agents, actions):
+        walkable_grid = self.object_tracker.walkable_grid
         collision_actions = []
         target_locations = []
         walkable = []
         for agent, action in zip(agents, actions):
             target_location = self.get_target_location(agent, action)
-            target_walkable = self.square_walkable(target_location)
+            target_walkable = walkable_grid[target_location]
             end_location = target_location if target_walkable else agent.location
             target_locations.append(end_location)
             walkable.append(target_walkable)
@@ -221,24 +245,13 @@ class CookingWorld:
         return collision_actions
 
     def square_walkable(self, location):
-        objects = self.get_objects_at(location, StaticObject)
-        if len(objects) != 1:
-            raise Exception(f"Not exactly one static object at location: {location}")
-        return objects[0].walkable
+        return self.object_tracker.walkable_grid[location]
 
     def get_abstract_object_at(self, location, object_type):
         return [obj for obj in self.abstract_index[object_type] if obj.location == location]
 
     def get_objects_at(self, location, object_type=object):
-        located_objects = []
-        for obj_class_string, objects in self.world_objects.items():
-            obj_class = StringToClass[obj_class_string]
-            if not issubclass(obj_class, object_type):
-                continue
-            for obj in objects:
-                if obj.location == location:
-                    located_objects.append(obj)
-        return located_objects
+        return self.object_tracker.get_objects_at(location, object_type)
 
     def attempt_merge(self, agent: Agent, dynamic_objects: List[DynamicObject], target_location, static_object):
         content_obj = self.filter_obj(dynamic_objects, ContentObject)
@@ -253,7 +266,7 @@ class CookingWorld:
                 agent.holding.add_content(dynamic_objects[pick_index])
                 dynamic_objects[pick_index].move_to(agent.location)
                 agent.interacts_with.append(dynamic_objects[pick_index])
-                static_object.content.remove(dynamic_objects[pick_index])
+                static_object.remove_content(dynamic_objects[pick_index])
         elif isinstance(static_object, ContentObject):
             if static_object.accepts(agent.holding):
                 static_object.add_content(agent.holding)
@@ -264,6 +277,12 @@ class CookingWorld:
         reset_world_counter()
         load_level.load_level(self, level, num_agents)
 
+    def snapshot(self):
+        return snapshot.take_snapshot(self)
+
+    def restore(self, world_snapshot):
+        snapshot.restore_snapshot(self, world_snapshot)
+
     def handle_agent_spawn(self):
         for i in range(len(self.active_agents)):
             if self.agent_grace_period[i] > 0:
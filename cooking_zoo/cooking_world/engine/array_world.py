@@ -0,0 +1,564 @@
+from cooking_zoo.cooking_world.actions import ActionScheme1, ActionScheme3
+from cooking_zoo.cooking_world.constants import ChopFoodStates, BlenderFoodStates, ActionObjectState
+from cooking_zoo.cooking_world.engine.snapshot import WorldSnapshot, CLASS_IDS, SNAPSHOT_LAYOUTS, object_attributes
+from cooking_zoo.cooking_world.world_objects import *
+
+import numpy as np
+
+
+def type_table(predicate):
+    return np.array([predicate(game_cls) for game_cls in GAME_CLASSES], dtype=bool)
+
+
+IS_STATIC = type_table(lambda game_cls: issubclass(game_cls, StaticObject))
+IS_DYNAMIC = type_table(lambda game_cls: issubclass(game_cls, DynamicObject))
+IS_CONTAINER = type_table(lambda game_cls: issubclass(game_cls, ContentObject))
+IS_PLATE = IS_DYNAMIC & IS_CONTAINER
+IS_FOOD = type_table(lambda game_cls: issubclass(game_cls, Food))
+IS_CHOP_FOOD = type_table(lambda game_cls: issubclass(game_cls, ChopFood))
+IS_BLENDER_FOOD = type_table(lambda game_cls: issubclass(game_cls, BlenderFood))
+IS_ACTION_OBJECT = type_table(lambda game_cls: issubclass(game_cls, ActionObject))
+SUPPORTED = type_table(lambda game_cls: game_cls in (Floor, Counter, Deliversquare, Switch, Block, Cutboard, Blender,
+                                                     Plate, Agent) or issubclass(game_cls, ChopFood))
+
+FLOOR, COUNTER, DELIVERSQUARE, SWITCH, BLOCK, CUTBOARD, BLENDER, BREAD = \
+    (CLASS_IDS[game_cls] for game_cls in (Floor, Counter, Deliversquare, Switch, Block, Cutboard, Blender, Bread))
+
+CHOP_STATES = [ChopFoodStates.FRESH, ChopFoodStates.CHOPPED]
+BLEND_STATES = [BlenderFoodStates.FRESH, BlenderFoodStates.IN_PROGRESS, BlenderFoodStates.MASHED]
+FRESH, CHOPPED = 0, 1
+IN_PROGRESS, MASHED = 1, 2
+
+# cell offsets of the walking actions and orientations, index 0 and the interactions stay on the cell
+DX = np.array([0, -1, 1, 0, 0, 0, 0, 0])
+DY = np.array([0, 0, 0, 1, -1, 0, 0, 0])
+
+
+class ArrayWorlds:
+    """Steps a batch of worlds of one level as NumPy arrays instead of objects.
+
+    Every object of a world is a row of (num_worlds x num_rows) arrays: location, walkability, free flag, chop and blend
+    state, blend progress, toggle, ready status, switch state, the row of the object whose content it is and a stamp
+    ordering the content of a container. Agents are rows of (num_worlds x num_agents) arrays. The batch is built from
+    loaded CookingWorlds with equal object lists, e.g. resets of the same level, and reproduces world_step of the object
+    engine for ActionScheme1 and ActionScheme3 exactly: all worlds are stepped at once with array operations, agents
+    act one after another as they do in the object engine. Rows for the chopped bread that chopping creates are
+    reserved up front. Agent spawning is not supported.
+
+    snapshot(idx) returns a WorldSnapshot equal to the one of the object engine in the same state (apart from the
+    unique ids of created objects), CookingWorld.restore turns it into objects again, e.g. to observe or evaluate
+    recipes. Worlds in a state in which the object engine raises are flagged in invalid and should be reset, reset(idx,
+    world_snapshot) replaces a world with a snapshot of the level, e.g. of a reset CookingWorld.
+    """
+
+    def __init__(self, worlds):
+        snapshots = [world.snapshot() for world in worlds]
+        first = snapshots[0]
+        self.action_scheme = worlds[0].action_scheme
+        if self.action_scheme not in (ActionScheme1, ActionScheme3):
+            raise ValueError(f"Only ActionScheme1 and ActionScheme3 are supported, not {self.action_scheme.__name__}")
+        for world in worlds:
+            if world.action_scheme != self.action_scheme:
+                raise ValueError("All worlds need the same action scheme")
+            if world.agent_respawn_rate or world.agent_despawn_rate:
+                raise ValueError("Agent spawning is not supported")
+        self.num_worlds = len(worlds)
+        self.num_agents = first.num_agents
+        self.width, self.height = worlds[0].width, worlds[0].height
+        self.type_names = first.type_names
+        self.type_counts = first.type_counts
+        num_objects = sum(first.type_counts)
+        type_ids = np.array([type_id for type_id, _ in first.objects[:num_objects]], dtype=np.int64)
+        if not SUPPORTED[type_ids].all():
+            raise ValueError(f"Unsupported objects {set(GAME_CLASSES[idx].__name__ for idx in type_ids)}")
+        self.num_objects = num_objects
+        num_rows = num_objects + int((type_ids == BREAD).sum())
+        self.type_ids = np.concatenate([type_ids, np.full(num_rows - num_objects, BREAD)])
+        # snapshots list the objects by type in the order of type_names, then in insertion order
+        type_ranks = {CLASS_IDS[StringToClass[name]]: rank for rank, name in enumerate(self.type_names)}
+        self.order_keys = np.array([type_ranks.get(type_id, len(type_ranks)) * num_rows + row
+                                    for row, type_id in enumerate(self.type_ids)], dtype=np.int64)
+
+        shape = (self.num_worlds, num_rows)
+        self.exists = np.zeros(shape, dtype=bool)
+        self.exists[:, :num_objects] = True
+        self.x = np.zeros(shape, dtype=np.int64)
+        self.y = np.zeros(shape, dtype=np.int64)
+        self.walkable = np.zeros(shape, dtype=bool)
+        self.free = np.zeros(shape, dtype=bool)
+        self.chop = np.zeros(shape, dtype=np.int8)
+        self.blend = np.zeros(shape, dtype=np.int8)
+        self.progress = np.zeros(shape, dtype=np.int64)
+        self.toggle = np.zeros(shape, dtype=bool)
+        self.ready = np.zeros(shape, dtype=bool)
+        self.switch_active = np.zeros(shape, dtype=bool)
+        self.button_pressed = np.zeros(shape, dtype=bool)
+        self.container = np.full(shape, -1, dtype=np.int64)
+        self.stamp = np.zeros(shape, dtype=np.int64)
+        # content lists are allocated lazily by the objects, snapshots tell an empty list from none
+        self.content_allocated = np.zeros(shape, dtype=bool)
+        self.unique_ids = np.zeros(shape, dtype=np.int64)
+        agent_shape = (self.num_worlds, self.num_agents)
+        self.agent_x = np.zeros(agent_shape, dtype=np.int64)
+        self.agent_y = np.zeros(agent_shape, dtype=np.int64)
+        self.orientation = np.zeros(agent_shape, dtype=np.int64)
+        self.holding = np.full(agent_shape, -1, dtype=np.int64)
+        self.interacts_with = np.full(agent_shape, -1, dtype=np.int64)
+        self.agent_floor = np.full(agent_shape, -1, dtype=np.int64)
+        self.agent_stamp = np.zeros(agent_shape, dtype=np.int64)
+        self.status_changed = np.zeros(agent_shape, dtype=bool)
+        self.grace_period = np.zeros(agent_shape, dtype=np.int64)
+        self.next_stamp = np.full(self.num_worlds, len(first.objects), dtype=np.int64)
+        self.num_created = np.zeros(self.num_worlds, dtype=np.int64)
+        self.invalid = np.zeros(self.num_worlds, dtype=bool)
+        self.walkable_grid = np.zeros((self.num_worlds, self.width, self.height), dtype=bool)
+        self.static_grid = np.full((self.num_worlds, self.width, self.height), -1, dtype=np.int64)
+        self.templates = [None] * self.num_worlds
+        self.agent_templates = [None] * self.num_worlds
+        self.constant_references = [None] * self.num_worlds
+        self.next_unique_id = 0
+        for idx, world_snapshot in enumerate(snapshots):
+            self.load_snapshot(idx, world_snapshot)
+
+        self.max_content = np.ones(num_rows, dtype=np.int64)
+        self.min_progress = np.zeros(num_rows, dtype=np.int64)
+        self.max_progress = np.zeros(num_rows, dtype=np.int64)
+        for row, (type_id, values) in enumerate(self.templates[0][:num_objects]):
+            plain = object_attributes(type_id, values)
+            self.max_content[row] = plain.get("max_content", 1)
+            self.min_progress[row] = plain.get("min_progress", 0)
+            self.max_progress[row] = plain.get("max_progress", 0)
+        self.blender_rows = np.flatnonzero(self.type_ids == BLENDER)
+        self.switch_rows = np.flatnonzero(self.type_ids == SWITCH)
+        self.block_rows = np.flatnonzero(self.type_ids == BLOCK)
+        # linked objects are the other linked objects of the same group, a switch in the group of another switch fails
+        # in the object engine when it is pressed
+        groups = [object_attributes(type_id, values).get("linked_group_id")
+                  for type_id, values in self.templates[0][:num_objects]]
+        self.switch_blocks = [[block for block in self.block_rows if groups[block] == groups[switch]]
+                              for switch in self.switch_rows]
+        if any(groups[switch] == groups[other] for switch in self.switch_rows for other in self.switch_rows
+               if switch != other):
+            raise ValueError("Switches linked to other switches are not supported")
+
+    def reset(self, idx, world_snapshot):
+        """Replaces world idx with the state of the snapshot, a snapshot of the level the worlds were built from"""
+        self.load_snapshot(idx, world_snapshot)
+
+    def load_snapshot(self, idx, world_snapshot):
+        if world_snapshot.type_names != self.type_names or world_snapshot.type_counts != self.type_counts or \
+                world_snapshot.num_agents != self.num_agents:
+            raise ValueError("All worlds need the same objects")
+        if not all(world_snapshot.active_agents):
+            raise ValueError("Agent spawning is not supported")
+        num_objects = self.num_objects
+        # rows of objects created in the world before, e.g. chopped bread, are free again
+        self.exists[idx] = np.arange(len(self.type_ids)) < num_objects
+        self.container[idx] = -1
+        self.stamp[idx] = 0
+        self.num_created[idx] = 0
+        self.agent_floor[idx] = -1
+        self.agent_stamp[idx] = 0
+        self.next_stamp[idx] = len(world_snapshot.objects)
+        self.invalid[idx] = False
+        self.static_grid[idx] = -1
+        for array in (self.x, self.y, self.walkable, self.free, self.chop, self.blend, self.progress, self.toggle,
+                      self.ready, self.switch_active, self.button_pressed, self.content_allocated, self.unique_ids):
+            array[idx, num_objects:] = 0
+        templates = []
+        constant_references = []
+        for row, (type_id, values) in enumerate(world_snapshot.objects):
+            templates.append((type_id, values))
+            attributes = object_attributes(type_id, values)
+            # references that never change, i.e. linked objects, given as rows
+            if "linked_objects" in attributes:
+                constant_references.append({"linked_objects": attributes["linked_objects"]})
+            else:
+                constant_references.append({})
+            if row >= num_objects:
+                agent = row - num_objects
+                self.agent_x[idx, agent], self.agent_y[idx, agent] = attributes["_location"]
+                self.orientation[idx, agent] = attributes["orientation"]
+                self.holding[idx, agent] = -1 if attributes["holding"] is None else attributes["holding"]
+                interacts_with = attributes["interacts_with"]
+                if len(interacts_with) > 1:
+                    raise ValueError("Agents interact with at most one object per step")
+                self.interacts_with[idx, agent] = interacts_with[0] if interacts_with else -1
+                continue
+            self.x[idx, row], self.y[idx, row] = attributes["_location"]
+            self.unique_ids[idx, row] = attributes["unique_id"]
+            self.walkable[idx, row] = attributes.get("_walkable", attributes.get("walkable", False))
+            self.free[idx, row] = attributes.get("free", False)
+            self.chop[idx, row] = CHOP_STATES.index(attributes.get("chop_state", ChopFoodStates.FRESH))
+            self.blend[idx, row] = BLEND_STATES.index(attributes.get("blend_state", BlenderFoodStates.FRESH))
+            self.progress[idx, row] = attributes.get("current_progress", 0)
+            self.toggle[idx, row] = attributes.get("toggle", False)
+            self.ready[idx, row] = attributes.get("status") == ActionObjectState.READY
+            self.switch_active[idx, row] = attributes.get("switch_active", False)
+            self.button_pressed[idx, row] = attributes.get("button_pressed", False)
+            content = attributes.get("_content")
+            self.content_allocated[idx, row] = content is not None
+            for position, ref in enumerate(content or ()):
+                if ref >= num_objects:
+                    self.agent_floor[idx, ref - num_objects] = row
+                    self.agent_stamp[idx, ref - num_objects] = position
+                else:
+                    self.container[idx, ref] = row
+                    self.stamp[idx, ref] = position
+            if IS_STATIC[type_id]:
+                x, y = attributes["_location"]
+                # cells without exactly one static object are never walkable, interactions with them fail
+                self.static_grid[idx, x, y] = row if self.static_grid[idx, x, y] == -1 else -2
+        # a cell is walkable if it holds exactly one static object and that one is walkable, as in the object tracker
+        static = self.static_grid[idx]
+        self.walkable_grid[idx] = (static >= 0) & self.walkable[idx, np.maximum(static, 0)]
+        self.next_unique_id = max(self.next_unique_id, int(self.unique_ids[idx, :num_objects].max(initial=0)) + 1)
+        bread_template = next((template for template in templates if template[0] == BREAD), None)
+        num_spare_rows = len(self.type_ids) - num_objects
+        self.templates[idx] = templates[:num_objects] + [bread_template] * num_spare_rows
+        self.agent_templates[idx] = templates[num_objects:]
+        self.constant_references[idx] = constant_references[:num_objects] + [{}] * num_spare_rows
+        self.status_changed[idx] = world_snapshot.status_changed
+        self.grace_period[idx] = world_snapshot.agent_grace_period
+
+    def step(self, actions):
+        """Performs one world_step of all worlds, actions is a (num_worlds x num_agents) array"""
+        actions = np.asarray(actions, dtype=np.int64)
+        assert actions.shape == (self.num_worlds, self.num_agents), \
+            f"Expected actions of shape {(self.num_worlds, self.num_agents)}, got {actions.shape}"
+        assert ((0 <= actions) & (actions < len(self.action_scheme.ACTIONS))).all(), "Invalid action"
+        self.status_changed[:] = False
+        self.interacts_with[:] = -1
+        walking = (1 <= actions) & (actions <= 4)
+        self.orientation[walking] = actions[walking]
+        target_x = self.agent_x + DX[actions]
+        target_y = self.agent_y + DY[actions]
+        inbounds = (0 <= target_x) & (target_x < self.width) & (0 <= target_y) & (target_y < self.height)
+        actions = np.where(walking & ~inbounds, 0, actions)
+        # a move onto a walkable cell that another agent ends on is cancelled, as is anything the other agent does
+        target_x = self.agent_x + DX[actions]
+        target_y = self.agent_y + DY[actions]
+        target_walkable = self.walkable_grid[np.arange(self.num_worlds)[:, None], target_x, target_y]
+        end_x = np.where(target_walkable, target_x, self.agent_x)
+        end_y = np.where(target_walkable, target_y, self.agent_y)
+        same_end = (end_x[:, :, None] == end_x[:, None, :]) & (end_y[:, :, None] == end_y[:, None, :])
+        same_end &= ~np.eye(self.num_agents, dtype=bool)
+        actions = np.where(same_end.any(2) & target_walkable, 0, actions)
+
+        for agent in range(self.num_agents):
+            if self.action_scheme == ActionScheme1:
+                self.perform_scheme1_actions(agent, actions[:, agent])
+            else:
+                self.perform_scheme3_actions(agent, actions[:, agent])
+        self.progress_world()
+        self.resolve_linked_interactions()
+        self.grace_period = np.maximum(self.grace_period - 1, 0)
+
+    def perform_scheme1_actions(self, agent, actions):
+        worlds = np.flatnonzero((1 <= actions) & (actions <= 4))
+        target_x = self.agent_x[worlds, agent] + DX[actions[worlds]]
+        target_y = self.agent_y[worlds, agent] + DY[actions[worlds]]
+        walkable = self.walkable_grid[worlds, target_x, target_y]
+        self.walk(worlds[walkable], agent, target_x[walkable], target_y[walkable])
+        self.primary_interaction(np.flatnonzero(actions == ActionScheme1.INTERACT_PRIMARY), agent)
+        self.pick_up_special(np.flatnonzero(actions == ActionScheme1.INTERACT_PICK_UP_SPECIAL), agent)
+        self.execute_action(np.flatnonzero(actions == ActionScheme1.EXECUTE_ACTION), agent)
+
+    def perform_scheme3_actions(self, agent, actions):
+        # every agent walks, a no-op walks onto the cell the agent stands on, walking into an obstacle interacts
+        worlds = np.arange(self.num_worlds)
+        target_x = self.agent_x[:, agent] + DX[actions]
+        target_y = self.agent_y[:, agent] + DY[actions]
+        walkable = self.walkable_grid[worlds, target_x, target_y]
+        interacting = worlds[~walkable & (actions != 0)]
+        self.walk(worlds[walkable], agent, target_x[walkable], target_y[walkable])
+
+        worlds, target_x, target_y = self.facing_free_cell(interacting, agent)
+        static = self.static_grid[worlds, target_x, target_y]
+        dynamic = self.dynamic_objects_at(worlds, target_x, target_y)
+        undone = (dynamic & ~self.done(worlds[:, None], np.arange(len(self.type_ids)))).any(1)
+        execute = IS_ACTION_OBJECT[self.type_ids[static]] & undone
+        self.execute_action(worlds[execute], agent)
+        self.primary_interaction(worlds[~execute], agent)
+
+    def walk(self, worlds, agent, x, y):
+        origin = self.static_grid[worlds, self.agent_x[worlds, agent], self.agent_y[worlds, agent]]
+        target = self.static_grid[worlds, x, y]
+        self.move_agent(worlds, agent, x, y)
+        self.interacts_with[worlds, agent] = target
+        # the origin drops its content, then the target takes the agent
+        left = self.agent_floor[worlds] == origin[:, None]
+        self.agent_floor[worlds] = np.where(left, -1, self.agent_floor[worlds])
+        self.content_allocated[worlds, origin] = False
+        self.agent_floor[worlds, agent] = target
+        self.agent_stamp[worlds, agent] = self.next_stamp[worlds]
+        self.next_stamp[worlds] += 1
+        self.content_allocated[worlds, target] = True
+        switches = worlds[self.type_ids[target] == SWITCH]
+        switch_rows = target[self.type_ids[target] == SWITCH]
+        self.switch_active[switches, switch_rows] ^= True
+        self.button_pressed[switches, switch_rows] = True
+
+    def facing_free_cell(self, worlds, agent):
+        """Returns the worlds in which the cell the agent faces holds no agent and one static object, and that cell"""
+        x = self.agent_x[worlds, agent] + DX[self.orientation[worlds, agent]]
+        y = self.agent_y[worlds, agent] + DY[self.orientation[worlds, agent]]
+        free = ~((self.agent_x[worlds] == x[:, None]) & (self.agent_y[worlds] == y[:, None])).any(1)
+        worlds, x, y = worlds[free], x[free], y[free]
+        # a missing static object fails in the object engine
+        missing = self.static_grid[worlds, x, y] < 0
+        self.invalid[worlds[missing]] = True
+        return worlds[~missing], x[~missing], y[~missing]
+
+    def primary_interaction(self, worlds, agent):
+        worlds, x, y = self.facing_free_cell(worlds, agent)
+        static = self.static_grid[worlds, x, y]
+        dynamic = self.dynamic_objects_at(worlds, x, y)
+        holding = self.holding[worlds, agent]
+        pick_up = (holding < 0) & dynamic.any(1)
+        self.pick_up(worlds[pick_up], agent, static[pick_up], dynamic[pick_up])
+        merge = holding >= 0
+        self.attempt_merge(worlds[merge], agent, static[merge], dynamic[merge], x[merge], y[merge])
+
+    def pick_up(self, worlds, agent, static, dynamic):
+        static_type = self.type_ids[static]
+        num_content = self.content_counts(worlds, static)
+        # releases() of cutboards and blenders updates their status
+        cutboard_emptied = (static_type == CUTBOARD) & (num_content == 1)
+        self.ready[worlds[cutboard_emptied], static[cutboard_emptied]] = False
+        blender_releases = ~self.toggle[worlds, static]
+        blender_emptied = (static_type == BLENDER) & blender_releases & (num_content == 1)
+        self.ready[worlds[blender_emptied], static[blender_emptied]] = False
+        releases = np.where(static_type == BLENDER, blender_releases, static_type != DELIVERSQUARE)
+        worlds, static, dynamic = worlds[releases], static[releases], dynamic[releases]
+        # the first free object is grabbed, otherwise the last one put on
+        free = dynamic & self.free[worlds]
+        first_free = np.where(free, self.order_keys, np.iinfo(np.int64).max).argmin(1)
+        last = np.where(dynamic, self.order_keys, -1).argmax(1)
+        grabbed = np.where(free.any(1), first_free, last)
+        grabbable = self.container[worlds, grabbed] == static
+        worlds, grabbed = worlds[grabbable], grabbed[grabbable]
+        self.grab(worlds, agent, grabbed)
+        self.interacts_with[worlds, agent] = grabbed
+
+    def attempt_merge(self, worlds, agent, static, dynamic, x, y):
+        holding = self.holding[worlds, agent]
+        plates = dynamic & IS_PLATE[self.type_ids]
+        one_plate = plates.sum(1) == 1
+        plate = plates.argmax(1)
+        onto_plate = one_plate & self.plate_accepts(worlds, plate, holding)
+        last = np.where(dynamic, self.order_keys, -1).argmax(1)
+        into_plate = ~one_plate & IS_PLATE[self.type_ids[holding]] & dynamic.any(1)
+        into_plate &= self.plate_accepts(worlds, holding, last)
+        onto_static = ~one_plate & ~(IS_PLATE[self.type_ids[holding]] & dynamic.any(1)) & \
+            self.static_accepts(worlds, static, holding)
+
+        # the held object onto the plate in front of the agent
+        merged = worlds[onto_plate]
+        self.add_content(merged, plate[onto_plate], holding[onto_plate])
+        self.put_down(merged, agent, x[onto_plate], y[onto_plate])
+        self.interacts_with[merged, agent] = plate[onto_plate]
+        # the last object in front of the agent into the held plate
+        merged, taken = worlds[into_plate], last[into_plate]
+        self.add_content(merged, holding[into_plate], taken)
+        self.x[merged, taken] = self.agent_x[merged, agent]
+        self.y[merged, taken] = self.agent_y[merged, agent]
+        self.interacts_with[merged, agent] = taken
+        # the held object onto the static object
+        merged, static = worlds[onto_static], static[onto_static]
+        action_objects = IS_ACTION_OBJECT[self.type_ids[static]]
+        self.ready[merged[action_objects], static[action_objects]] = True
+        self.add_content(merged, static, holding[onto_static])
+        self.put_down(merged, agent, x[onto_static], y[onto_static])
+        self.interacts_with[merged, agent] = static
+
+    def pick_up_special(self, worlds, agent):
+        worlds, x, y = self.facing_free_cell(worlds, agent)
+        dynamic = self.dynamic_objects_at(worlds, x, y)
+        plates = dynamic & IS_PLATE[self.type_ids]
+        picking = (self.holding[worlds, agent] < 0) & (plates.sum(1) == 1)
+        worlds, plate = worlds[picking], plates[picking].argmax(1)
+        content = self.container[worlds] == plate[:, None]
+        # the last object put on the plate
+        picking = content.any(1)
+        top = np.where(content, self.stamp[worlds], -1).argmax(1)
+        self.grab(worlds[picking], agent, top[picking])
+
+    def execute_action(self, worlds, agent):
+        worlds, x, y = self.facing_free_cell(worlds, agent)
+        static = self.static_grid[worlds, x, y]
+        static_type = self.type_ids[static]
+        usable = self.ready[worlds, static]
+
+        blender = usable & (static_type == BLENDER)
+        self.toggle[worlds[blender], static[blender]] ^= True
+        self.interacts_with[worlds[blender], agent] = static[blender]
+
+        cutboard = usable & (static_type == CUTBOARD)
+        worlds, static = worlds[cutboard], static[cutboard]
+        content = self.container[worlds] == static[:, None]
+        fresh = content & IS_CHOP_FOOD[self.type_ids] & (self.chop[worlds] == FRESH)
+        # a ready cutboard without fresh food fails in the object engine
+        self.invalid[worlds[~fresh.any(1)]] = True
+        chopping = fresh.any(1)
+        worlds, static = worlds[chopping], static[chopping]
+        food = np.where(fresh[chopping], self.stamp[worlds], np.iinfo(np.int64).max).argmin(1)
+        self.chop[worlds, food] = CHOPPED
+        self.ready[worlds, static] = False
+        self.interacts_with[worlds, agent] = static
+        bread = self.type_ids[food] == BREAD
+        self.create_chopped_bread(worlds[bread], static[bread], food[bread])
+
+    def create_chopped_bread(self, worlds, cutboard, bread):
+        rows = self.num_objects + self.num_created[worlds]
+        self.num_created[worlds] += 1
+        self.exists[worlds, rows] = True
+        self.x[worlds, rows] = self.x[worlds, bread]
+        self.y[worlds, rows] = self.y[worlds, bread]
+        self.free[worlds, rows] = True
+        self.chop[worlds, rows] = CHOPPED
+        self.unique_ids[worlds, rows] = self.next_unique_id + np.arange(len(worlds))
+        self.next_unique_id += len(worlds)
+        # appended to the cutboard without updating the free flags
+        self.container[worlds, rows] = cutboard
+        self.stamp[worlds, rows] = self.next_stamp[worlds]
+        self.next_stamp[worlds] += 1
+
+    def progress_world(self):
+        worlds = np.arange(self.num_worlds)
+        for blender in self.blender_rows:
+            content = self.container == blender
+            running = self.toggle[:, blender] & content.any(1)
+            blending = content & running[:, None] & ~self.done(worlds[:, None], np.arange(len(self.type_ids)))
+            self.progress -= blending
+            self.blend = np.where(blending, np.where(self.progress > self.max_progress, IN_PROGRESS, MASHED),
+                                  self.blend).astype(np.int8)
+            finished = running & ((self.blend == MASHED) | ~content).all(1)
+            self.toggle[finished, blender] = False
+            self.ready[finished, blender] = False
+            self.progress = np.where(content & finished[:, None], self.min_progress, self.progress)
+        # the last object of every content list is free
+        contained = self.container >= 0
+        flat_container = (worlds[:, None] * len(self.type_ids) + self.container)[contained]
+        top_stamp = np.full(self.num_worlds * len(self.type_ids), -1, dtype=np.int64)
+        np.maximum.at(top_stamp, flat_container, self.stamp[contained])
+        self.free[contained] = self.stamp[contained] == top_stamp[flat_container]
+
+    def resolve_linked_interactions(self):
+        for switch, blocks in zip(self.switch_rows, self.switch_blocks):
+            pressed = self.button_pressed[:, switch]
+            for block in blocks:
+                self.walkable[pressed, block] ^= True
+                cells = self.static_grid[pressed, self.x[pressed, block], self.y[pressed, block]] == block
+                flipped = np.flatnonzero(pressed)[cells]
+                self.walkable_grid[flipped, self.x[flipped, block], self.y[flipped, block]] = \
+                    self.walkable[flipped, block]
+            self.button_pressed[:, switch] = False
+
+    def move_agent(self, worlds, agent, x, y):
+        self.agent_x[worlds, agent] = x
+        self.agent_y[worlds, agent] = y
+        holding = self.holding[worlds, agent]
+        carrying = holding >= 0
+        self.move(worlds[carrying], holding[carrying], x[carrying], y[carrying])
+
+    def move(self, worlds, rows, x, y):
+        """Moves the objects and their content"""
+        self.x[worlds, rows] = x
+        self.y[worlds, rows] = y
+        content = self.container[worlds] == rows[:, None]
+        self.x[worlds] = np.where(content, x[:, None], self.x[worlds])
+        self.y[worlds] = np.where(content, y[:, None], self.y[worlds])
+
+    def grab(self, worlds, agent, rows):
+        self.holding[worlds, agent] = rows
+        self.container[worlds, rows] = -1
+        self.move(worlds, rows, self.agent_x[worlds, agent], self.agent_y[worlds, agent])
+
+    def put_down(self, worlds, agent, x, y):
+        self.move(worlds, self.holding[worlds, agent], x, y)
+        self.holding[worlds, agent] = -1
+
+    def add_content(self, worlds, containers, rows):
+        self.container[worlds, rows] = containers
+        self.stamp[worlds, rows] = self.next_stamp[worlds]
+        self.next_stamp[worlds] += 1
+        self.content_allocated[worlds, containers] = True
+        content = self.container[worlds] == containers[:, None]
+        self.free[worlds] &= ~content
+        self.free[worlds, rows] = True
+
+    def content_counts(self, worlds, containers):
+        return (self.container[worlds] == containers[:, None]).sum(1)
+
+    def dynamic_objects_at(self, worlds, x, y):
+        return self.exists[worlds] & IS_DYNAMIC[self.type_ids] & (self.x[worlds] == x[:, None]) & \
+            (self.y[worlds] == y[:, None])
+
+    def done(self, worlds, rows):
+        return (self.chop[worlds, rows] == CHOPPED) | \
+            (IS_BLENDER_FOOD[self.type_ids[rows]] & (self.blend[worlds, rows] == MASHED))
+
+    def plate_accepts(self, worlds, plates, rows):
+        return IS_FOOD[self.type_ids[rows]] & self.done(worlds, rows) & \
+            (self.content_counts(worlds, plates) < self.max_content[plates])
+
+    def static_accepts(self, worlds, static, rows):
+        static_type = self.type_ids[static]
+        has_room = self.content_counts(worlds, static) < self.max_content[static]
+        cutboard = IS_CHOP_FOOD[self.type_ids[rows]] & (self.chop[worlds, rows] == FRESH)
+        blender = IS_BLENDER_FOOD[self.type_ids[rows]] & ~self.toggle[worlds, static] & \
+            (self.blend[worlds, rows] == FRESH)
+        return has_room & (((static_type == COUNTER) | (static_type == DELIVERSQUARE)) |
+                           ((static_type == CUTBOARD) & cutboard) | ((static_type == BLENDER) & blender))
+
+    def snapshot(self, idx):
+        """Returns the state of a world as the WorldSnapshot the object engine takes"""
+        rows = np.flatnonzero(self.exists[idx])
+        rows = rows[np.argsort(self.order_keys[rows])]
+        index = {row: position for position, row in enumerate(rows.tolist())}
+        agent_index = [len(rows) + agent for agent in range(self.num_agents)]
+        content = {}
+        for row in rows[self.container[idx, rows] >= 0].tolist():
+            content.setdefault(int(self.container[idx, row]), []).append((self.stamp[idx, row], index[row]))
+        for agent in range(self.num_agents):
+            if self.agent_floor[idx, agent] >= 0:
+                content.setdefault(int(self.agent_floor[idx, agent]), []).append((self.agent_stamp[idx, agent],
+                                                                                   agent_index[agent]))
+        templates = self.templates[idx]
+        objects = []
+        for row in rows.tolist():
+            type_id, values = templates[row]
+            state = {"_location": (int(self.x[idx, row]), int(self.y[idx, row])),
+                     "unique_id": int(self.unique_ids[idx, row]), "_walkable": bool(self.walkable[idx, row]),
+                     "free": bool(self.free[idx, row]), "chop_state": CHOP_STATES[self.chop[idx, row]],
+                     "blend_state": BLEND_STATES[self.blend[idx, row]],
+                     "current_progress": int(self.progress[idx, row]), "toggle": bool(self.toggle[idx, row]),
+                     "status": ActionObjectState.READY if self.ready[idx, row] else ActionObjectState.NOT_USABLE,
+                     "switch_active": bool(self.switch_active[idx, row]),
+                     "button_pressed": bool(self.button_pressed[idx, row])}
+            if self.content_allocated[idx, row]:
+                state["_content"] = tuple(position for _, position in sorted(content.get(row, [])))
+            else:
+                state["_content"] = None
+            for attr, refs in self.constant_references[idx][row].items():
+                state[attr] = tuple(index[ref] for ref in refs)
+            objects.append((type_id, tuple(state.get(attr, value)
+                                           for attr, value in zip(SNAPSHOT_LAYOUTS[type_id], values))))
+        for agent in range(self.num_agents):
+            type_id, values = self.agent_templates[idx][agent]
+            holding = int(self.holding[idx, agent])
+            interacts_with = int(self.interacts_with[idx, agent])
+            state = {"_location": (int(self.agent_x[idx, agent]), int(self.agent_y[idx, agent])),
+                     "orientation": int(self.orientation[idx, agent]),
+                     "holding": None if holding < 0 else index[holding],
+                     "interacts_with": () if interacts_with < 0 else (index[interacts_with],)}
+            objects.append((type_id, tuple(state.get(attr, value)
+                                           for attr, value in zip(SNAPSHOT_LAYOUTS[type_id], values))))
+        type_counts = [0] * len(self.type_names)
+        rank = {name: position for position, name in enumerate(self.type_names)}
+        for row in rows.tolist():
+            type_counts[rank[GAME_CLASSES[self.type_ids[row]].__name__]] += 1
+        return WorldSnapshot(self.type_names, tuple(type_counts), tuple(objects), self.num_agents,
+                             (True,) * self.num_agents, tuple(self.status_changed[idx].tolist()),
+                             tuple(self.grace_period[idx].tolist()))
@@ -1,29 +1,102 @@
 from cooking_zoo.cooking_world.engine import parsing
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from cooking_zoo.cooking_world.abstract_classes import LinkedObject
 
 import os.path
 import json
-import copy
 
 
-def load_new_style_level(world, level_name, num_agents):
+UTILS_DIR = Path(os.path.dirname(os.path.realpath(__file__))).parent.parent / "utils"
+
+# Parsed level and meta files, shared by all worlds of the process. Entries are keyed by file path. Resets do not touch
+# the file system, new environments call refresh_compiled_files, which drops the entries of modified files.
+CompiledLevel = namedtuple("CompiledLevel", ["level_object", "layout", "static_objects", "dynamic_objects",
+                                             "dynamic_excluded_positions", "agents"])
+_compiled_levels = {}
+_compiled_meta_files = {}
+
+
+def level_file(level_name):
     if level_name.endswith(".json"):
-        file = level_name
-    else:
-        my_path = os.path.realpath(__file__)
-        dir_name = os.path.dirname(my_path)
-        path = Path(dir_name)
-        file = path.parent.parent / f"utils/level/{level_name}.json"
+        return str(level_name)
+    return str(UTILS_DIR / f"level/{level_name}.json")
+
+
+def meta_file_path(meta_file):
+    if meta_file.endswith(".json"):
+        return str(meta_file)
+    return str(UTILS_DIR / f"meta_files/{meta_file}.json")
+
+
+class FrozenDict(dict):
+    """Read-only dict of a compiled file, the compiled files are shared by all worlds of the process"""
+
+    def read_only(self, *args, **kwargs):
+        raise TypeError("compiled level files are shared by all worlds and are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def cached_file(cache, file, compile_file):
+    entry = cache.get(file)
+    if entry is None:
+        entry = (os.stat(file).st_mtime_ns, compile_file(file))
+        cache[file] = entry
+    return entry[1]
+
+
+def drop_modified_file(cache, file):
+    entry = cache.get(file)
+    if entry is not None and entry[0] != os.stat(file).st_mtime_ns:
+        del cache[file]
+
+
+def refresh_compiled_files(level_name, meta_file):
+    drop_modified_file(_compiled_levels, level_file(level_name))
+    drop_modified_file(_compiled_meta_files, meta_file_path(meta_file))
+
+
+def compile_level(file):
     with open(file) as json_file:
-        level_object = json.load(json_file)
-        json_file.close()
-        world.level_object = level_object
-    parsing.parse_level_layout(world, level_object)
-    parsing.parse_static_objects(world, level_object)
-    parsing.parse_dynamic_objects(world, level_object)
-    parsing.parse_agents(world, level_object, num_agents)
+        level_object = freeze(json.load(json_file))
+    return CompiledLevel(level_object, tuple(level_object["LEVEL_LAYOUT"].splitlines()),
+                         level_object["STATIC_OBJECTS"], level_object["DYNAMIC_OBJECTS"],
+                         frozenset(tuple(position) for position in level_object["DYNAMIC_EXCLUDED_POSITIONS"]),
+                         level_object["AGENTS"])
+
+
+def compile_meta_file(file):
+    with open(file) as json_file:
+        meta_object = json.load(json_file)
+    # dictionaries in python are ordered since 3.7
+    return {list(dic.keys())[0]: list(dic.values())[0] for dic in meta_object}
+
+
+def load_new_style_level(world, level_name, num_agents):
+    compiled_level = cached_file(_compiled_levels, level_file(level_name), compile_level)
+    world.level_object = compiled_level.level_object
+    parsing.parse_level_layout(world, compiled_level)
+    parsing.parse_static_objects(world, compiled_level)
+    parsing.parse_dynamic_objects(world, compiled_level)
+    parsing.parse_agents(world, compiled_level, num_agents)
 
 
 def cross_link(world):
@@ -37,35 +110,20 @@ def cross_link(world):
 
 
 def load_meta_file(meta_file):
-    if meta_file.endswith(".json"):
-        file = meta_file
-    else:
-        my_path = os.path.realpath(__file__)
-        dir_name = os.path.dirname(my_path)
-        path = Path(dir_name)
-        file = path.parent.parent / f"utils/meta_files/{meta_file}.json"
-    with open(file) as json_file:
-        meta_object = json.load(json_file)
-        json_file.close()
-    # dictionaries in python are ordered since 3.7
-    meta_dict = {list(dic.keys())[0]: list(dic.values())[0] for dic in meta_object}
-    return meta_dict
+    return dict(cached_file(_compiled_meta_files, meta_file_path(meta_file), compile_meta_file))
 
 
 def load_level(world, level, num_agents):
     if world.init_world is not None:
-        world.world_objects = defaultdict(list)
-        world.abstract_index = defaultdict(list)
-        world.world_objects.update(copy.deepcopy(world.init_world))
-        world.agents = copy.deepcopy(world.init_agents)
+        # rebuild the initial state from the immutable level template instead of copying objects
+        world.restore(world.init_world)
     else:
         load_new_style_level(world, level, num_agents)
-        world.abstract_index = defaultdict(list)
-        world.init_world = defaultdict(list)
-        world.init_world.update(copy.deepcopy(world.world_objects))
-        world.init_agents = copy.deepcopy(world.agents)
+        world.object_tracker.build_walkable_grid(world.width, world.height)
+        world.abstract_index = defaultdict(dict)
+        world.index_objects()
+        cross_link(world)
+        world.init_world = world.snapshot()
     world.active_agents = [True] * len(world.agents)
     world.status_changed = [False] * len(world.agents)
     world.relevant_agents = world.compute_relevant_agents()
-    world.index_objects()
-    cross_link(world)
@@ -0,0 +1,122 @@
+from cooking_zoo.cooking_world.abstract_classes import StaticObject, DynamicObject, ContentObject, ProcessingObject
+from collections import defaultdict
+
+import numpy as np
+
+
+class ObjectTracker:
+    """Per-cell occupancy index of the objects of a world.
+
+    Objects report location changes to their tracker, so that location queries do not have to scan all objects.
+    Every cell keeps its objects in the same order a scan over world_objects would return them (type insertion order
+    first, then order of insertion into the type list). Once the level is loaded, the tracker also keeps a boolean
+    width x height grid of walkable cells, which static objects update when their walkability changes.
+
+    Consumers that maintain derived state (e.g. observations) register a change set, which collects every object that
+    moved or changed its state until the consumer clears it. Adding or removing objects bumps structure_version.
+
+    The world takes the dirty objects once per step in progress_world: objects report with mark_dirty when their
+    content changed or they have to be processed, containers and processors are dirty from the moment they are added.
+    """
+
+    def __init__(self, world_objects):
+        self.world_objects = world_objects
+        self.static_cells = defaultdict(list)
+        self.dynamic_cells = defaultdict(list)
+        self.sort_keys = {}
+        self.type_rank = {}
+        self.num_inserted = 0
+        self.walkable_grid = None
+        self.change_sets = []
+        self.structure_version = 0
+        # insertion ordered, so that dirty objects are processed in a reproducible order
+        self.dirty_objects = {}
+
+    def add(self, obj):
+        name = type(obj).__name__
+        if name not in self.type_rank:
+            self.type_rank = {type_name: rank for rank, type_name in enumerate(self.world_objects)}
+        self.sort_keys[obj] = (self.type_rank[name], self.num_inserted)
+        self.num_inserted += 1
+        self.insert_into_cell(self.cells_of(obj)[obj.location], obj)
+        obj.tracker = self
+        self.structure_version += 1
+        self.object_changed(obj)
+        if isinstance(obj, (ContentObject, ProcessingObject)):
+            self.object_dirty(obj)
+        if isinstance(obj, StaticObject):
+            self.update_walkable_cell(obj.location)
+
+    def remove(self, obj):
+        cell = self.cells_of(obj)[obj.location]
+        cell.remove(obj)
+        del self.sort_keys[obj]
+        obj.tracker = None
+        self.dirty_objects.pop(obj, None)
+        self.structure_version += 1
+        if isinstance(obj, StaticObject):
+            self.update_walkable_cell(obj.location)
+
+    def object_moved(self, obj, old_location, new_location):
+        if old_location == new_location:
+            return
+        cells = self.cells_of(obj)
+        cells[old_location].remove(obj)
+        self.insert_into_cell(cells[new_location], obj)
+        self.object_changed(obj)
+
+    def object_changed(self, obj):
+        for change_set in self.change_sets:
+            change_set.add(obj)
+
+    def object_dirty(self, obj):
+        self.dirty_objects[obj] = None
+
+    def take_dirty_objects(self):
+        dirty_objects, self.dirty_objects = self.dirty_objects, {}
+        return dirty_objects
+
+    def register_change_set(self):
+        change_set = set()
+        self.change_sets.append(change_set)
+        return change_set
+
+    def walkability_changed(self, obj):
+        self.update_walkable_cell(obj.location)
+        self.object_changed(obj)
+
+    def build_walkable_grid(self, width, height):
+        self.walkable_grid = np.zeros((width, height), dtype=bool)
+        for x in range(width):
+            for y in range(height):
+                self.update_walkable_cell((x, y))
+
+    def update_walkable_cell(self, location):
+        if self.walkable_grid is None:
+            return
+        x, y = location
+        if not (0 <= x < self.walkable_grid.shape[0] and 0 <= y < self.walkable_grid.shape[1]):
+            return
+        static_objects = self.static_cells.get(location, [])
+        # cells without exactly one static object are malformed and never walkable
+        self.walkable_grid[x, y] = len(static_objects) == 1 and static_objects[0].walkable
+
+    def get_objects_at(self, location, object_type=object):
+        if issubclass(object_type, StaticObject):
+            located_objects = self.static_cells.get(location, [])
+        elif issubclass(object_type, DynamicObject):
+            located_objects = self.dynamic_cells.get(location, [])
+        else:
+            located_objects = self.static_cells.get(location, []) + self.dynamic_cells.get(location, [])
+            located_objects.sort(key=self.sort_keys.__getitem__)
+        return [obj for obj in located_objects if isinstance(obj, object_type)]
+
+    def cells_of(self, obj):
+        return self.static_cells if isinstance(obj, StaticObject) else self.dynamic_cells
+
+    def insert_into_cell(self, cell, obj):
+        key = self.sort_keys[obj]
+        idx = len(cell)
+        while idx > 0 and self.sort_keys[cell[idx - 1]] > key:
+            idx -= 1
+        cell.insert(idx, obj)
@@ -2,11 +2,10 @@ import random
 from cooking_zoo.cooking_world.world_objects import *
 
 
-def parse_level_layout(world, level_object):
-    level_layout = level_object["LEVEL_LAYOUT"]
+def parse_level_layout(world, compiled_level):
     x = 0
     y = 0
-    for y, line in enumerate(iter(level_layout.splitlines())):
+    for y, line in enumerate(compiled_level.layout):
         for x, char in enumerate(line):
             if char == "-":
                 counter = Counter(location=(x, y))
@@ -18,8 +17,8 @@ def parse_level_layout(world, level_object):
     world.height = y + 1
 
 
-def parse_static_objects(world, level_object):
-    static_objects = level_object["STATIC_OBJECTS"]
+def parse_static_objects(world, compiled_level):
+    static_objects = compiled_level.static_objects
     for static_object in static_objects:
         name = list(static_object.keys())[0]
         for idx in range(static_object[name]["COUNT"]):
@@ -76,9 +75,9 @@ def parse_static_objects(world, level_object):
                     continue
 
 
-def parse_dynamic_objects(world, level_object):
-    dynamic_objects = level_object["DYNAMIC_OBJECTS"]
-    dynamic_excluded_positions = level_object["DYNAMIC_EXCLUDED_POSITIONS"]
+def parse_dynamic_objects(world, compiled_level):
+    dynamic_objects = compiled_level.dynamic_objects
+    dynamic_excluded_positions = compiled_level.dynamic_excluded_positions
     for dynamic_object in dynamic_objects:
         name = list(dynamic_object.keys())[0]
         for idx in range(dynamic_object[name]["COUNT"]):
@@ -98,8 +97,8 @@ def parse_dynamic_objects(world, level_object):
                 static_objects_loc = world.get_objects_at((x, y), Counter)
                 dynamic_objects_loc = world.get_objects_at((x, y), DynamicObject)
 
-                if len(static_objects_loc) == 1 and not dynamic_objects_loc and [x,
-                                                                                 y] not in dynamic_excluded_positions:
+                if len(static_objects_loc) == 1 and not dynamic_objects_loc and \
+                        (x, y) not in dynamic_excluded_positions:
                     if world.meta_object_information[name] <= world.loaded_object_counter[name]:
                         raise ValueError(f"Too many {name} objects loaded")
                     world.loaded_object_counter[name] += 1
@@ -115,8 +114,8 @@ def parse_dynamic_objects(world, level_object):
                     continue
 
 
-def parse_agents(world, level_object, num_agents):
-    agent_objects = level_object["AGENTS"]
+def parse_agents(world, compiled_level, num_agents):
+    agent_objects = compiled_level.agents
     agent_idx = 0
     for agent_object in agent_objects:
         for idx in range(agent_object["MAX_COUNT"]):
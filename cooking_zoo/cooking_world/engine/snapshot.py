@@ -0,0 +1,288 @@
+from cooking_zoo.cooking_world.abstract_classes import StaticObject, ContentObject, ProcessingObject, slot_names
+from cooking_zoo.cooking_world.world_objects import GAME_CLASSES
+from collections import namedtuple, defaultdict
+from operator import attrgetter, itemgetter
+
+
+# Objects are stored as (type id, values), the values follow the attribute layout of the class in SNAPSHOT_LAYOUTS:
+# locations, chop/blend/toggle states, orientation, ... References to other objects (containment edges, the object an
+# agent holds, ...) are stored as indices into the object list of the snapshot, world objects first, then agents.
+class WorldSnapshot(namedtuple("WorldSnapshot", ["type_names", "type_counts", "objects", "num_agents",
+                                                 "active_agents", "status_changed", "agent_grace_period"])):
+    __slots__ = ()
+
+    def __deepcopy__(self, memo):
+        # snapshots only hold tuples of immutable values, copies of a world share them
+        return self
+
+
+CLASS_IDS = {game_cls: idx for idx, game_cls in enumerate(GAME_CLASSES)}
+
+REFERENCE_LIST_ATTRIBUTES = ("_content", "interacts_with", "linked_objects")
+REFERENCE_ATTRIBUTES = ("holding",)
+DETACHED_ATTRIBUTES = ("tracker",)
+# attributes of static objects that are set when the level is loaded, restores keep them
+STATIC_CONSTANT_ATTRIBUTES = ("unique_id", "_location", "movable", "max_content", "linked_group_id", "linked_objects")
+
+SNAPSHOT_LAYOUTS = [tuple(attr for attr in slot_names(game_cls) if attr not in DETACHED_ATTRIBUTES)
+                    for game_cls in GAME_CLASSES]
+
+
+class ClassLayout:
+    """Precomputed access to the snapshot values of the objects of one game class"""
+
+    def __init__(self, type_id):
+        self.game_cls = GAME_CLASSES[type_id]
+        self.attributes = SNAPSHOT_LAYOUTS[type_id]
+        self.get_values = attrgetter(*self.attributes)
+        self.is_static = issubclass(self.game_cls, StaticObject)
+        self.is_dirty_when_tracked = issubclass(self.game_cls, (ContentObject, ProcessingObject))
+        reference_attributes = REFERENCE_LIST_ATTRIBUTES + REFERENCE_ATTRIBUTES
+        self.plain = tuple((position, attr) for position, attr in enumerate(self.attributes)
+                           if attr not in reference_attributes)
+        self.references = tuple((position, attr, attr in REFERENCE_LIST_ATTRIBUTES)
+                                for position, attr in enumerate(self.attributes) if attr in reference_attributes)
+        # restores only write the state of static objects, a static object of the world stands for the static object
+        # of the snapshot with the same constants
+        constants = STATIC_CONSTANT_ATTRIBUTES if self.is_static else ()
+        self.plain_state = tuple(item for item in self.plain if item[1] not in constants)
+        self.reference_state = tuple(item for item in self.references if item[1] not in constants)
+        constant_positions = [position for position, attr in self.plain if attr in constants]
+        self.get_snapshot_constants = itemgetter(0, *constant_positions)
+        self.get_constants = attrgetter(*(self.attributes[position] for position in [0] + constant_positions))
+
+
+LAYOUTS = [ClassLayout(type_id) for type_id in range(len(GAME_CLASSES))]
+CLASS_LAYOUTS = dict(zip(GAME_CLASSES, LAYOUTS))
+
+
+def object_attributes(type_id, values):
+    """Returns the attributes of an object of a snapshot by name"""
+    return dict(zip(SNAPSHOT_LAYOUTS[type_id], values))
+
+
+def encode_objects(all_objects):
+    object_index = {id(obj): idx for idx, obj in enumerate(all_objects)}
+    objects = []
+    for obj in all_objects:
+        game_cls = type(obj)
+        layout = CLASS_LAYOUTS[game_cls]
+        values = layout.get_values(obj)
+        if layout.references:
+            values = list(values)
+            for position, _, is_list in layout.references:
+                refs = values[position]
+                if refs is not None:
+                    values[position] = tuple(object_index[id(ref)] for ref in refs) if is_list \
+                        else object_index[id(refs)]
+            values = tuple(values)
+        objects.append((CLASS_IDS[game_cls], values))
+    return tuple(objects)
+
+
+def take_snapshot(world):
+    all_objects = [obj for obj_list in world.world_objects.values() for obj in obj_list] + world.agents
+    return WorldSnapshot(tuple(world.world_objects.keys()),
+                         tuple(len(obj_list) for obj_list in world.world_objects.values()),
+                         encode_objects(all_objects), len(world.agents), tuple(world.active_agents),
+                         tuple(world.status_changed), tuple(world.agent_grace_period))
+
+
+def set_values(obj, values, all_objects, plain, references):
+    for position, attr in plain:
+        setattr(obj, attr, values[position])
+    for position, attr, is_list in references:
+        refs = values[position]
+        if refs is not None:
+            refs = [all_objects[idx] for idx in refs] if is_list else all_objects[refs]
+        setattr(obj, attr, refs)
+
+
+def detached_objects(snapshot: WorldSnapshot):
+    """Returns new world objects (by type name) and agents built from the snapshot, not attached to any tracker"""
+    all_objects = []
+    for type_id, _ in snapshot.objects:
+        game_cls = GAME_CLASSES[type_id]
+        obj = game_cls.__new__(game_cls)
+        obj.tracker = None
+        all_objects.append(obj)
+    for obj, (type_id, values) in zip(all_objects, snapshot.objects):
+        layout = LAYOUTS[type_id]
+        set_values(obj, values, all_objects, layout.plain, layout.references)
+
+    world_objects = defaultdict(list)
+    start = 0
+    for type_name, count in zip(snapshot.type_names, snapshot.type_counts):
+        world_objects[type_name] = all_objects[start:start + count]
+        start += count
+    return world_objects, all_objects[start:start + snapshot.num_agents]
+
+
+def read_only(self, *args, **kwargs):
+    raise AttributeError(f"{type(self).__name__} of a symbolic view is shared by all agents and is read-only")
+
+
+def frozen_instance(game_cls):
+    return game_cls.__new__(frozen_class(game_cls))
+
+
+def set_frozen_state(self, state):
+    for attr, value in state.items():
+        object.__setattr__(self, attr, value)
+
+
+def reduce_frozen(self, protocol):
+    # the frozen classes are created at runtime, pickles refer to the game class
+    return frozen_instance, (type(self).__bases__[0],), self.__getstate__()
+
+
+def same_object(self, *args):
+    return self
+
+
+FROZEN_CLASSES = {}
+
+
+def frozen_class(game_cls):
+    """Returns the read-only subclass of a game class, with the same name and slots"""
+    frozen_cls = FROZEN_CLASSES.get(game_cls)
+    if frozen_cls is None:
+        frozen_cls = type(game_cls)(game_cls.__name__, (game_cls,), {
+            "__slots__": (), "__module__": game_cls.__module__, "__setattr__": read_only, "__delattr__": read_only,
+            "__reduce_ex__": reduce_frozen, "__setstate__": set_frozen_state, "__copy__": same_object,
+            "__deepcopy__": same_object})
+        FROZEN_CLASSES[game_cls] = frozen_cls
+    return frozen_cls
+
+
+class SymbolicView(dict):
+    """Read-only objects of a world snapshot by type name, the agents under "Agent", types without objects map to ().
+    The objects hold tuples instead of lists and raise on assignment."""
+
+    def read_only(self, *args, **kwargs):
+        raise TypeError("symbolic views are shared by the observations of all agents and are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = read_only
+
+    def __missing__(self, key):
+        return ()
+
+    def __reduce__(self):
+        return SymbolicView, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def frozen_view(snapshot: WorldSnapshot):
+    """Returns the objects of the snapshot as a SymbolicView"""
+    objects, agents = detached_objects(snapshot)
+    objects["Agent"] = agents
+    for obj_list in objects.values():
+        for obj in obj_list:
+            game_cls = type(obj)
+            for _, attr, is_list in CLASS_LAYOUTS[game_cls].references:
+                refs = getattr(obj, attr)
+                if is_list and refs is not None:
+                    setattr(obj, attr, tuple(refs))
+            obj.__class__ = frozen_class(game_cls)
+    return SymbolicView((type_name, tuple(obj_list)) for type_name, obj_list in objects.items())
+
+
+def matching_objects(world, snapshot: WorldSnapshot):
+    """Returns the objects of the world that take the place of the objects of the snapshot, in the order of the
+    snapshot, together with the objects to create and the objects to remove. All static objects are kept, dynamic
+    objects are reused by position within their type. Returns None if the static objects differ."""
+    if snapshot.type_names != tuple(world.world_objects) or snapshot.num_agents != len(world.agents):
+        return None
+    all_objects = []
+    new_objects = []
+    removed_objects = []
+    start = 0
+    for obj_list, count in zip(world.world_objects.values(), snapshot.type_counts):
+        entries = snapshot.objects[start:start + count]
+        start += count
+        if not entries:
+            if obj_list and isinstance(obj_list[0], StaticObject):
+                return None
+            removed_objects.extend(obj_list)
+            continue
+        layout = LAYOUTS[entries[0][0]]
+        if layout.is_static:
+            if len(obj_list) != count:
+                return None
+            for obj, (_, values) in zip(obj_list, entries):
+                if layout.get_constants(obj) != layout.get_snapshot_constants(values):
+                    return None
+            all_objects.extend(obj_list)
+            continue
+        all_objects.extend(obj_list[:count])
+        removed_objects.extend(obj_list[count:])
+        for _ in range(count - len(obj_list)):
+            obj = layout.game_cls.__new__(layout.game_cls)
+            obj.tracker = None
+            new_objects.append(obj)
+            all_objects.append(obj)
+    all_objects.extend(world.agents)
+    return all_objects, new_objects, removed_objects
+
+
+def restore_in_place(world, snapshot, all_objects, new_objects, removed_objects):
+    tracker = world.object_tracker
+    for obj in removed_objects:
+        tracker.remove(obj)
+    moved = []
+    walkability_changed = []
+    for obj, (type_id, values) in zip(all_objects, snapshot.objects):
+        layout = LAYOUTS[type_id]
+        if layout.is_static:
+            walkable = obj._walkable
+            set_values(obj, values, all_objects, layout.plain_state, layout.reference_state)
+            if obj._walkable != walkable:
+                walkability_changed.append(obj)
+        elif obj.tracker is not None:
+            old_location = obj._location
+            set_values(obj, values, all_objects, layout.plain_state, layout.reference_state)
+            if obj._location != old_location:
+                moved.append((obj, old_location))
+        else:
+            # agents and new objects are not tracked
+            set_values(obj, values, all_objects, layout.plain_state, layout.reference_state)
+    for obj, old_location in moved:
+        tracker.object_moved(obj, old_location, obj._location)
+    for obj in walkability_changed:
+        tracker.walkability_changed(obj)
+    start = 0
+    for obj_list, count in zip(world.world_objects.values(), snapshot.type_counts):
+        obj_list[:] = all_objects[start:start + count]
+        start += count
+    for obj in new_objects:
+        tracker.add(obj)
+    if new_objects or removed_objects:
+        world.abstract_index = defaultdict(dict)
+        world.index_objects()
+    # observations and recipe evaluations start over, containers and processors are processed in the next step, as if
+    # the objects had been tracked anew
+    tracker.structure_version += 1
+    tracker.dirty_objects = {obj: None for obj, (type_id, _) in zip(all_objects, snapshot.objects)
+                             if LAYOUTS[type_id].is_dirty_when_tracked and obj.tracker is tracker}
+
+
+def restore_snapshot(world, snapshot: WorldSnapshot):
+    """Restores the world in place, static objects and their cells are kept. A snapshot with other static objects,
+    e.g. of another placement of the level, rebuilds the world."""
+    matched = matching_objects(world, snapshot)
+    if matched is None:
+        world.world_objects, world.agents = detached_objects(snapshot)
+        world.abstract_index = defaultdict(dict)
+        world.index_objects()
+        world.track_objects()
+    else:
+        restore_in_place(world, snapshot, *matched)
+    world.active_agents = list(snapshot.active_agents)
+    world.status_changed = list(snapshot.status_changed)
+    world.agent_grace_period = list(snapshot.agent_grace_period)
+    world.relevant_agents = world.compute_relevant_agents()
@@ -15,6 +15,7 @@ def reset_world_counter():
 
 
 class Floor(StaticObject, ContentObject):
+    __slots__ = mixin_slots(StaticObject, ContentObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -28,7 +29,7 @@ class Floor(StaticObject, ContentObject):
 
     def add_content(self, content):
         assert isinstance(content, Agent), f"Floors can only hold Agents as content! not {content}"
-        self.content.append(content)
+        self.put_content(content)
 
     def numeric_state_representation(self):
         return 1,
@@ -55,6 +56,7 @@ class Floor(StaticObject, ContentObject):
 
 
 class Counter(StaticObject, ContentObject):
+    __slots__ = mixin_slots(StaticObject, ContentObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -69,7 +71,7 @@ class Counter(StaticObject, ContentObject):
         return True
 
     def add_content(self, content):
-        self.content.append(content)
+        self.put_content(content)
         for c in self.content:
             c.free = False
         self.content[-1].free = True
@@ -99,6 +101,7 @@ class Counter(StaticObject, ContentObject):
 
 
 class Deliversquare(StaticObject, ContentObject):
+    __slots__ = mixin_slots(StaticObject, ContentObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -109,7 +112,7 @@ class Deliversquare(StaticObject, ContentObject):
 
     def add_content(self, content):
         if self.accepts(content):
-            self.content.append(content)
+            self.put_content(content)
             for c in self.content:
                 c.free = False
             self.content[-1].free = True
@@ -142,6 +145,7 @@ class Deliversquare(StaticObject, ContentObject):
 
 
 class Switch(StaticObject, ContentObject, LinkedObject):
+    __slots__ = mixin_slots(StaticObject, ContentObject, LinkedObject) + ("switch_active", "button_pressed")
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -158,9 +162,10 @@ class Switch(StaticObject, ContentObject, LinkedObject):
 
     def add_content(self, content):
         assert isinstance(content, Agent), f"Floors can only hold Agents as content! not {content}"
-        self.content.append(content)
+        self.put_content(content)
         self.switch_active = not self.switch_active
         self.button_pressed = True
+        self.mark_changed()
 
     def process_linked_objects(self):
         if self.button_pressed:
@@ -193,6 +198,7 @@ class Switch(StaticObject, ContentObject, LinkedObject):
 
 
 class Block(StaticObject, ContentObject, LinkedObject):
+    __slots__ = mixin_slots(StaticObject, ContentObject, LinkedObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -210,7 +216,7 @@ class Block(StaticObject, ContentObject, LinkedObject):
 
     def add_content(self, content):
         assert isinstance(content, Agent), f"Blocks can only hold Agents as content! not {content}"
-        self.content.append(content)
+        self.put_content(content)
 
     def switch_state(self):
         self.walkable = not self.walkable
@@ -240,6 +246,7 @@ class Block(StaticObject, ContentObject, LinkedObject):
 
 
 class Cutboard(StaticObject, ActionObject, ContentObject):
+    __slots__ = mixin_slots(StaticObject, ActionObject, ContentObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -256,9 +263,9 @@ class Cutboard(StaticObject, ActionObject, ContentObject):
 
                     if action_executed:
                         for del_obj in deleted_obj_list:
-                            self.content.remove(del_obj)
+                            self.remove_content(del_obj)
                         for new_obj in new_obj_list:
-                            self.content.append(new_obj)
+                            self.put_content(new_obj)
 
                         self.status = ActionObjectState.NOT_USABLE
 
@@ -280,7 +287,7 @@ class Cutboard(StaticObject, ActionObject, ContentObject):
     def add_content(self, content):
         if self.accepts(content):
             self.status = ActionObjectState.READY
-            self.content.append(content)
+            self.put_content(content)
             for c in self.content:
                 c.free = False
             self.content[-1].free = True
@@ -312,6 +319,7 @@ class Cutboard(StaticObject, ActionObject, ContentObject):
 
 
 class Blender(StaticObject, ProcessingObject, ContentObject, ToggleObject, ActionObject):
+    __slots__ = mixin_slots(StaticObject, ProcessingObject, ContentObject, ToggleObject, ActionObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -333,6 +341,9 @@ class Blender(StaticObject, ProcessingObject, ContentObject, ToggleObject, Actio
 
                 for cont in self.content:
                     cont.current_progress = cont.min_progress
+            else:
+                # keeps blending in the next step
+                self.mark_dirty()
 
     def accepts(self, dynamic_object) -> bool:
         return isinstance(dynamic_object, BlenderFood) and (not self.toggle) and len(self.content) + 1 <= self.max_content and dynamic_object.blend_state == BlenderFoodStates.FRESH
@@ -348,7 +359,7 @@ class Blender(StaticObject, ProcessingObject, ContentObject, ToggleObject, Actio
     def add_content(self, content):
         if self.accepts(content):
             self.status = ActionObjectState.READY
-            self.content.append(content)
+            self.put_content(content)
             for c in self.content:
                 c.free = False
             self.content[-1].free = True
@@ -384,6 +395,7 @@ class Blender(StaticObject, ProcessingObject, ContentObject, ToggleObject, Actio
 
 
 class Plate(DynamicObject, ContentObject):
+    __slots__ = mixin_slots(DynamicObject, ContentObject)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -400,7 +412,7 @@ class Plate(DynamicObject, ContentObject):
             raise TypeError(f"Only Food can be added to a plate! Tried to add {content.name()}")
         if not content.done():
             raise Exception(f"Can't add food in unprepared state.")
-        self.content.append(content)
+        self.put_content(content)
         for c in self.content:
             c.free = False
         self.content[-1].free = True
@@ -433,6 +445,7 @@ class Plate(DynamicObject, ContentObject):
 
 
 class Onion(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -469,6 +482,7 @@ class Onion(ChopFood):
 
 
 class Tomato(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -505,6 +519,7 @@ class Tomato(ChopFood):
 
 
 class Lettuce(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -541,6 +556,7 @@ class Lettuce(ChopFood):
 
 
 class Carrot(BlenderFood, ChopFood):
+    __slots__ = mixin_slots(BlenderFood, ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -581,6 +597,7 @@ class Carrot(BlenderFood, ChopFood):
 
 
 class Cucumber(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -614,6 +631,7 @@ class Cucumber(ChopFood):
 
 
 class Banana(BlenderFood, ChopFood):
+    __slots__ = mixin_slots(BlenderFood, ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -654,6 +672,7 @@ class Banana(BlenderFood, ChopFood):
 
 
 class Apple(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -690,6 +709,7 @@ class Apple(ChopFood):
 
 
 class Watermelon(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -726,6 +746,7 @@ class Watermelon(ChopFood):
 
 
 class Bread(ChopFood):
+    __slots__ = mixin_slots(ChopFood)
 
     def __init__(self, location):
         unique_id = next(world_id_counter)
@@ -738,6 +759,7 @@ class Bread(ChopFood):
     def chop(self):
         if self.chop_state == ChopFoodStates.FRESH:
             self.chop_state = ChopFoodStates.CHOPPED
+            self.mark_changed()
             new_chopped_bread = Bread(self.location)
             new_chopped_bread.chop_state = ChopFoodStates.CHOPPED
             return [new_chopped_bread], [], True
@@ -772,6 +794,7 @@ class Bread(ChopFood):
 
 
 class Agent(Object):
+    __slots__ = ("walkable", "holding", "color", "name", "orientation", "interacts_with")
 
     def __init__(self, location, color, name):
         unique_id = next(world_id_counter)
@@ -829,5 +852,8 @@ GAME_CLASSES = [m[1] for m in inspect.getmembers(sys.modules[__name__], inspect.
 
 StringToClass = {game_cls.__name__: game_cls for game_cls in GAME_CLASSES}
 ClassToString = {game_cls: game_cls.__name__ for game_cls in GAME_CLASSES}
+# the abstract classes every game class belongs to, in the order of ABSTRACT_GAME_CLASSES
+AbstractClasses = {game_cls: tuple(abstract_cls for abstract_cls in ABSTRACT_GAME_CLASSES
+                                   if issubclass(game_cls, abstract_cls)) for game_cls in GAME_CLASSES}
 
 
@@ -1,3 +1,6 @@
 from cooking_zoo.environment.environment import GymCookingEnvironment
 from cooking_zoo.environment.multi_agent_gym import GymCookingEnvironment as GymCookingEnvironmentMA
 from cooking_zoo.environment.cooking_env import CookingEnvironment as CookingZooEnvironment
+from cooking_zoo.environment.vector_env import VectorCookingEnv
+from cooking_zoo.environment.subproc_vector_env import SubprocVectorCookingEnv
+from cooking_zoo.environment.recorder import EpisodeRecorder
@@ -2,9 +2,12 @@
 import copy
 
 from cooking_zoo.cooking_world.cooking_world import CookingWorld
+from cooking_zoo.cooking_world.engine.load_level import refresh_compiled_files
+from cooking_zoo.cooking_world.engine.snapshot import detached_objects, frozen_view
 from cooking_zoo.cooking_world.world_objects import *
 from cooking_zoo.cooking_world.actions import *
 from cooking_zoo.cooking_book.recipe_drawer import RECIPES, NUM_GOALS, RECIPE_STORE, DEFAULT_NUM_GOALS
+from cooking_zoo.cooking_book.recipe import SharedRecipeEvaluator
 
 import numpy as np
 from collections import namedtuple, defaultdict
@@ -13,11 +16,17 @@ from pettingzoo.utils import agent_selector
 from pettingzoo.utils import wrappers
 from pettingzoo.utils.conversions import parallel_wrapper_fn
 from gymnasium.utils import seeding
-from cooking_zoo.environment.game.graphic_pipeline import GraphicPipeline
+from cooking_zoo.environment.feature_vector import FeatureVectorBuilder
+from cooking_zoo.environment.tensor_observation import TensorObservationBuilder
+from cooking_zoo.environment.image_observation import ImageObservationBuilder
 import gymnasium as gym
 
 
 CollisionRepr = namedtuple("CollisionRepr", "time agent_names agent_locations")
+EnvironmentSnapshot = namedtuple("EnvironmentSnapshot", ["world", "recipe_marks", "t", "termination_info", "agents",
+                                                         "agent_selection", "agent_selector", "accumulated_actions",
+                                                         "rewards", "cumulative_rewards", "terminations",
+                                                         "truncations", "infos"])
 COLORS = ['blue', 'magenta', 'yellow', 'green']
 
 FPS = 20
@@ -25,7 +34,8 @@ FPS = 20
 
 def env(level, meta_file, num_agents, max_steps, recipes, agent_visualization=None, obs_spaces=None,
         end_condition_all_dishes=False, action_scheme="scheme1", render=False, reward_scheme=None,
-        agent_respawn_rate=0.0, grace_period=20, agent_despawn_rate=0.0):
+        agent_respawn_rate=0.0, grace_period=20, agent_despawn_rate=0.0, render_mode="human", image_tile_size=12,
+        mutable_symbolic_obs=False):
     """
     The env function wraps the environment in 3 wrappers by default. These
     wrappers contain logic that is common to many pettingzoo environments.
@@ -37,7 +47,8 @@ def env(level, meta_file, num_agents, max_steps, recipes, agent_visualization=No
                                   obs_spaces, end_condition_all_dishes=end_condition_all_dishes,
                                   action_scheme=action_scheme, render=render, reward_scheme=reward_scheme,
                                   agent_respawn_rate=agent_respawn_rate, grace_period=grace_period,
-                                  agent_despawn_rate=agent_despawn_rate)
+                                  agent_despawn_rate=agent_despawn_rate, render_mode=render_mode,
+                                  image_tile_size=image_tile_size, mutable_symbolic_obs=mutable_symbolic_obs)
     env_init = wrappers.CaptureStdoutWrapper(env_init)
     env_init = wrappers.OrderEnforcingWrapper(env_init)
     return env_init
@@ -61,14 +72,15 @@ class CookingEnvironment(AECEnv):
 
     def __init__(self, level, meta_file, num_agents, max_steps, recipes, agent_visualization=None, obs_spaces=None,
                  end_condition_all_dishes=False, allowed_objects=None, action_scheme="scheme1", render=False,
-                 reward_scheme=None, agent_respawn_rate=0.0, grace_period=20, agent_despawn_rate=0.0):
+                 reward_scheme=None, agent_respawn_rate=0.0, grace_period=20, agent_despawn_rate=0.0,
+                 render_mode="human", image_tile_size=12, mutable_symbolic_obs=False):
         super().__init__()
 
         obs_spaces = obs_spaces or ["feature_vector"]
-        self.allowed_obs_spaces = ["symbolic", "full", "feature_vector"]
+        self.allowed_obs_spaces = ["symbolic", "full", "feature_vector", "image"]
         self.action_scheme = action_scheme
         self.action_scheme_class = self.action_scheme_map[self.action_scheme]
-        assert len(set(obs_spaces + self.allowed_obs_spaces)) == 3, \
+        assert len(set(obs_spaces + self.allowed_obs_spaces)) == len(self.allowed_obs_spaces), \
             f"Selected invalid obs spaces. Allowed {self.allowed_obs_spaces}"
         assert len(obs_spaces) != 0, f"Please select an observation space from: {self.allowed_obs_spaces}"
         self.obs_spaces = obs_spaces
@@ -88,6 +100,8 @@ class CookingEnvironment(AECEnv):
         self.filename = ""
         self.set_filename()
         self.meta_file = meta_file
+        # files modified since they were compiled are parsed again by the first world of a new environment
+        refresh_compiled_files(level, meta_file)
         self.world = CookingWorld(self.action_scheme_class, meta_file, agent_respawn_rate=agent_respawn_rate,
                                   grace_period=grace_period, agent_despawn_rate=agent_despawn_rate)
         assert self.num_agents <= self.world.meta_object_information["Agent"], \
@@ -95,6 +109,9 @@ class CookingEnvironment(AECEnv):
         self.recipe_names = recipes
         self.recipes = recipes
         self.graphic_pipeline = None
+        self.mutable_symbolic_obs = mutable_symbolic_obs
+        self.symbolic_snapshot = None
+        self.symbolic_view = None
         self.game = None
         self.render_flag = render
         if RECIPE_STORE:
@@ -104,6 +121,7 @@ class CookingEnvironment(AECEnv):
             self.recipes = RECIPES
             self.num_goals = DEFAULT_NUM_GOALS
         self.recipe_graphs = [self.recipes[recipe]() for recipe in recipes]
+        self.recipe_evaluator = SharedRecipeEvaluator(self.recipe_graphs)
 
         self.termination_info = ""
         self.world.load_level(level=self.level, num_agents=num_agents)
@@ -117,15 +135,22 @@ class CookingEnvironment(AECEnv):
             self.feature_vector_representation_length += cls.feature_vector_length() * num
         numeric_obs_space = {'feature_vector': gym.spaces.Box(low=0, high=10,
                                                               shape=(self.world.width, self.world.height,
-                                                                     self.graph_representation_length), dtype=np.int32),
+                                                                     self.graph_representation_length),
+                                                              dtype=TensorObservationBuilder.dtype),
                              'agent_location': gym.spaces.Box(low=0, high=max(self.world.width, self.world.height),
                                                               shape=(2,)),
                              'goal_vector': gym.spaces.MultiBinary(self.num_goals)}
+        self.feature_vector_builder = FeatureVectorBuilder(self.world.meta_object_information)
         self.feature_obs_space = gym.spaces.Box(low=-1, high=1,
                                                 shape=(self.feature_vector_representation_length,))
+        self.image_observation_builder = ImageObservationBuilder(image_tile_size, self.agent_visualization)
+        self.image_obs_space = gym.spaces.Box(low=0, high=255,
+                                              shape=self.image_observation_builder.image_shape(self.world),
+                                              dtype=np.uint8)
         obs_space_dict = {"full": numeric_obs_space,
                           "feature_vector": self.feature_obs_space,
-                          "symbolic": {}}
+                          "symbolic": {},
+                          "image": self.image_obs_space}
         self.observation_spaces = {agent: obs_space_dict[obs_space]
                                    for agent, obs_space in zip(self.possible_agents, self.obs_spaces)}
         self.action_spaces = {agent: gym.spaces.Discrete(len(self.action_scheme_class.ACTIONS))
@@ -146,9 +171,10 @@ class CookingEnvironment(AECEnv):
         self.truncations = dict(zip(self.agents, [False for _ in self.agents]))
         self.infos = dict(zip(self.agents, [{} for _ in self.agents]))
         self.accumulated_actions = []
-        self.current_tensor_observation = np.zeros((self.world.width, self.world.height,
-                                                    self.graph_representation_length))
-        self.render_mode = "human"
+        self.tensor_observation_builder = TensorObservationBuilder()
+        assert render_mode in self.metadata["render_modes"], \
+            f"Selected invalid render mode. Allowed {self.metadata['render_modes']}"
+        self.render_mode = render_mode
         self.np_random = None
         self.loaded_recipes = []
         if not RECIPE_STORE:
@@ -188,14 +214,17 @@ class CookingEnvironment(AECEnv):
         self.agent_selection = self._agent_selector.next()
         
         # Load world & distances.
-        if options["full_reset"]:
+        # a full reset re-parses the level (new random placement), otherwise the initial state of the current level
+        # is rebuilt from its template
+        if options.get("full_reset", True):
             self.world = CookingWorld(self.action_scheme_class, self.meta_file,
                                       agent_respawn_rate=self.agent_respawn_rate, grace_period=self.grace_period,
                                       agent_despawn_rate=self.agent_despawn_rate)
         self.world.load_level(level=self.level, num_agents=self.num_agents)
+        self.symbolic_snapshot = None
+        self.symbolic_view = None
 
-        for recipe in self.recipe_graphs:
-            recipe.update_recipe_state(self.world)
+        self.recipe_evaluator.update_recipe_states(self.world)
 
         # Get an image observation
         self.recipe_mapping = dict(zip(self.possible_agents, self.recipe_graphs))
@@ -232,6 +261,8 @@ class CookingEnvironment(AECEnv):
         if self._agent_selector.is_last():
             self.accumulated_step(self.accumulated_actions)
             self.accumulated_actions = []
+            # the agents taking part in the next step, accumulated_step itself does not select agents
+            self._agent_selector = agent_selector(self.agents)
             for ag in self.agents:
                 if self.terminations[ag] or self.truncations[ag]:
                     self.agent_selection = ag
@@ -244,6 +275,8 @@ class CookingEnvironment(AECEnv):
         self.t += 1
         active_agents_start = self.world.active_agents[:]
         self.world.world_step(actions)
+        self.symbolic_snapshot = None
+        self.symbolic_view = None
         dones, rewards, goals, infos, truncations = self.compute_rewards(active_agents_start, actions)
         info = {"t": self.t, "termination_info": self.termination_info}
 
@@ -266,24 +299,22 @@ class CookingEnvironment(AECEnv):
 
         self.agents = [agent for idx, agent in enumerate(self.possible_agents[:])
                        if self.world.active_agents[idx] or self.world.status_changed[idx]]
-        self._agent_selector = agent_selector(self.agents)
 
     def observe(self, agent):
         obs_space = self.obs_spaces[self.possible_agents.index(agent)]
         observation = []
         if "full" == obs_space:
-            num_observation = {'feature_vector': self.current_tensor_observation,
+            # the recipe keeps updating its goal array, the observation gets a copy of it
+            num_observation = {'feature_vector': self.tensor_observation_builder.observation(self.world),
                                'agent_location': np.asarray(self.world_agent_mapping[agent].location, np.int32),
-                               'goal_vector': self.recipe_mapping[agent].goals_completed(self.num_goals)}
+                               'goal_vector': self.recipe_mapping[agent].goals_completed(self.num_goals).copy()}
             observation.append(num_observation)
         if "symbolic" == obs_space:
-            objects = defaultdict(list)
-            objects.update(self.world.world_objects)
-            objects["Agent"] = self.world.agents
-            sym_observation = copy.deepcopy(objects)
-            observation.append(sym_observation)
+            observation.append(self.get_symbolic_view())
         if "feature_vector" == obs_space:
             observation.append(self.get_feature_vector(agent))
+        if "image" == obs_space:
+            observation.append(self.image_observation_builder.observation(self.world))
         returned_observation = observation if not len(observation) == 1 else observation[0]
         return returned_observation
 
@@ -294,14 +325,14 @@ class CookingEnvironment(AECEnv):
         # Done if the episode maxes out
         truncations = self.compute_truncated()
 
+        open_goals_before = [recipe.num_open_goals for recipe in self.recipe_graphs]
+        completion_before = [recipe.completed() for recipe in self.recipe_graphs]
+        self.recipe_evaluator.update_recipe_states(self.world)
         for idx, recipe in enumerate(self.recipe_graphs):
-            goals_before = recipe.goals_completed(self.num_goals)
-            completion_before = recipe.completed()
-            recipe.update_recipe_state(self.world)
             open_goals[idx] = recipe.goals_completed(self.num_goals)
-            malus = not recipe.completed() and completion_before
-            bonus = recipe.completed() and not completion_before
-            rewards[idx] += (sum(goals_before) - sum(open_goals[idx])) * self.reward_scheme["recipe_node_reward"]
+            malus = not recipe.completed() and completion_before[idx]
+            bonus = recipe.completed() and not completion_before[idx]
+            rewards[idx] += (open_goals_before[idx] - recipe.num_open_goals) * self.reward_scheme["recipe_node_reward"]
             rewards[idx] += bonus * self.reward_scheme["recipe_reward"]
             rewards[idx] += malus * self.reward_scheme["recipe_penalty"]
             rewards[idx] += (self.reward_scheme["max_time_penalty"] / self.max_steps)
@@ -350,36 +381,63 @@ class CookingEnvironment(AECEnv):
         return truncated
 
     def get_feature_vector(self, agent):
-        feature_vector = []
-        objects = defaultdict(list)
-        objects.update(self.world.world_objects)
-        objects["Agent"] = self.world.agents
-        x, y = self.world_agent_mapping[agent].location
-        for name, num in self.world.meta_object_information.items():
-            cls = StringToClass[name]
-            current_num = 0
-            for obj in objects[ClassToString[cls]]:
-                features = list(obj.feature_vector_representation())
-                if features and obj is not self.world_agent_mapping[agent]:
-                    features[0] = (features[0] - x) / self.world.width
-                    features[1] = (features[1] - y) / self.world.height
-                if obj is self.world_agent_mapping[agent]:
-                    features[0] = features[0] / self.world.width
-                    features[1] = features[1] / self.world.height
-                feature_vector.extend(features)
-                current_num += 1
-            feature_vector.extend([0] * (num - current_num) * cls.feature_vector_length())
-        new_vector = np.array(feature_vector)
-        return new_vector
+        return self.feature_vector_builder.agent_views(self.world)[self.agent_name_mapping[agent]]
+
+    def get_symbolic_view(self):
+        # the world is snapshotted once per step and all agents share one read-only view of it, which stays valid after
+        # the step. With mutable_symbolic_obs every observation gets its own objects detached from the snapshot
+        if self.symbolic_snapshot is None:
+            self.symbolic_snapshot = self.world.snapshot()
+        if self.mutable_symbolic_obs:
+            objects, agents = detached_objects(self.symbolic_snapshot)
+            objects["Agent"] = agents
+            return objects
+        if self.symbolic_view is None:
+            self.symbolic_view = frozen_view(self.symbolic_snapshot)
+        return self.symbolic_view
+
+    def snapshot(self):
+        recipe_marks = tuple(tuple(node.marked for node in recipe.node_list) for recipe in self.recipe_graphs)
+        return EnvironmentSnapshot(self.world.snapshot(), recipe_marks, self.t, self.termination_info,
+                                   self.agents[:], self.agent_selection, copy.copy(self._agent_selector),
+                                   self.accumulated_actions[:], dict(self.rewards), dict(self._cumulative_rewards),
+                                   dict(self.terminations), dict(self.truncations), dict(self.infos))
+
+    def restore(self, env_snapshot):
+        self.world.restore(env_snapshot.world)
+        self.symbolic_snapshot = None
+        self.symbolic_view = None
+        for recipe, marks in zip(self.recipe_graphs, env_snapshot.recipe_marks):
+            recipe.restore_marks(marks)
+        self.t = env_snapshot.t
+        self.termination_info = env_snapshot.termination_info
+        self.agents = env_snapshot.agents[:]
+        self.agent_selection = env_snapshot.agent_selection
+        self._agent_selector = copy.copy(env_snapshot.agent_selector)
+        self.accumulated_actions = env_snapshot.accumulated_actions[:]
+        self.rewards = dict(env_snapshot.rewards)
+        self._cumulative_rewards = dict(env_snapshot.cumulative_rewards)
+        self.terminations = dict(env_snapshot.terminations)
+        self.truncations = dict(env_snapshot.truncations)
+        self.infos = dict(env_snapshot.infos)
+        self.world_agent_mapping = dict(zip(self.possible_agents, self.world.agents))
+        self.world_agent_to_env_agent_mapping = dict(zip(self.world.agents, self.possible_agents))
 
     def get_agent_names(self):
         return [agent.name for agent in self.world.agents]
 
     def render(self, **kwargs):
+        # rgb_array renders into a hidden surface and returns the frame, human shows it if the render flag is set
+        display = self.render_flag and self.render_mode == "human"
         if not self.graphic_pipeline:
-            self.graphic_pipeline = GraphicPipeline(self.world, self.agent_visualization, self.render_flag)
+            # pygame is imported and initialized on the first render, headless training never loads it
+            from cooking_zoo.environment.game.graphic_pipeline import GraphicPipeline
+            self.graphic_pipeline = GraphicPipeline(self.world, self.agent_visualization, display)
             self.graphic_pipeline.initialize()
-        self.graphic_pipeline.render(self.render_flag)
+        self.graphic_pipeline.world = self.world
+        self.graphic_pipeline.render(display)
+        if self.render_mode == "rgb_array":
+            return self.graphic_pipeline.get_frame()
 
     def screenshot(self, path="screenshot.png"):
         self.graphic_pipeline.save_image(path)
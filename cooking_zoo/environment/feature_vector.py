@@ -0,0 +1,102 @@
+from cooking_zoo.cooking_world.world_objects import StringToClass, ClassToString
+
+import numpy as np
+
+
+class FeatureVectorBuilder:
+    """Builds the feature_vector observations of all agents of a world.
+
+    The world part of the observation is kept in a preallocated (num_slots x max_feature_length) float32 array with one
+    row per object slot of the meta file. Rows are only rewritten for objects that moved or changed their state since
+    the last update; a change of the object structure (objects added or deleted, a new world or restored snapshot)
+    rebuilds all rows. Agent rows are always refreshed, agents are not part of the tracked world objects.
+    """
+
+    def __init__(self, meta_object_information):
+        self.slot_classes = []
+        self.class_rows = {}
+        row_lengths = []
+        for name, num in meta_object_information.items():
+            cls = StringToClass[name]
+            self.class_rows[ClassToString[cls]] = (len(self.slot_classes), num)
+            self.slot_classes.extend([cls] * num)
+            row_lengths.extend([cls.feature_vector_length()] * num)
+        self.row_lengths = np.asarray(row_lengths, dtype=np.int64)
+        max_length = max(2, int(self.row_lengths.max(initial=0)))
+        self.valid_entries = np.arange(max_length)[None, :] < self.row_lengths[:, None]
+        self.features = np.zeros((len(self.slot_classes), max_length), dtype=np.float32)
+        self.present = np.zeros(len(self.slot_classes), dtype=bool)
+        self.object_rows = {}
+        self.agent_rows = []
+        self.tracker = None
+        self.change_set = None
+        self.structure_version = -1
+        self.views = None
+        self.views_key = None
+
+    def agent_views(self, world):
+        """Returns a (num_agents x feature_vector_length) array with the observation of every agent of the world.
+
+        The array is read-only and reused as long as the observations do not change, changes create a new array.
+        """
+        views_key = tuple((agent.location, agent.orientation) for agent in world.agents)
+        if self.update(world) or self.views_key != views_key:
+            self.views = self.compute_views(world)
+            self.views_key = views_key
+        return self.views
+
+    def update(self, world):
+        tracker = world.object_tracker
+        if tracker is not self.tracker or tracker.structure_version != self.structure_version:
+            self.rebuild(world)
+            return True
+        changed = False
+        for obj in self.change_set:
+            row = self.object_rows.get(obj)
+            if row is not None:
+                self.write_row(row, obj)
+                changed = True
+        self.change_set.clear()
+        for row, agent in zip(self.agent_rows, world.agents):
+            self.write_row(row, agent)
+        return changed
+
+    def rebuild(self, world):
+        tracker = world.object_tracker
+        if tracker is not self.tracker:
+            self.tracker = tracker
+            self.change_set = tracker.register_change_set()
+        self.structure_version = tracker.structure_version
+        self.change_set.clear()
+        self.features.fill(0)
+        self.present.fill(False)
+        self.object_rows = {}
+        self.agent_rows = []
+        for name, (start, num) in self.class_rows.items():
+            objects = world.agents if name == "Agent" else world.world_objects.get(name, [])
+            # objects beyond the slots of the meta file have no place in the observation
+            for row, obj in zip(range(start, start + num), objects):
+                if name == "Agent":
+                    self.agent_rows.append(row)
+                else:
+                    self.object_rows[obj] = row
+                self.write_row(row, obj)
+
+    def write_row(self, row, obj):
+        features = obj.feature_vector_representation()
+        if len(features):
+            self.features[row, :len(features)] = features
+            self.present[row] = True
+
+    def compute_views(self, world):
+        locations = np.asarray([agent.location for agent in world.agents], dtype=np.float32).reshape(-1, 2)
+        agent_rows = np.asarray(self.agent_rows[:len(locations)], dtype=np.int64)
+        views = np.broadcast_to(self.features, (len(locations),) + self.features.shape).copy()
+        # positions of all other objects relative to the observing agent, the agent itself keeps its absolute position
+        views[:, self.present, :2] -= locations[:, None, :]
+        views[np.arange(len(agent_rows)), agent_rows, :2] = self.features[agent_rows, :2]
+        views[:, :, :2] /= np.asarray([world.width, world.height], dtype=np.float32)
+        views = views[:, self.valid_entries]
+        # returned again in later steps without changes, writing into an observation must not corrupt those
+        views.flags.writeable = False
+        return views
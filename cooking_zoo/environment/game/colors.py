@@ -0,0 +1,6 @@
+class Color:
+    BLACK = (0, 0, 0)
+    FLOOR = (245, 230, 210)  # light gray
+    COUNTER = (220, 170, 110)  # tan/gray
+    COUNTER_BORDER = (114, 93, 51)  # darker tan
+    DELIVERY = (96, 96, 96)  # grey
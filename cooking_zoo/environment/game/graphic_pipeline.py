@@ -37,7 +37,10 @@ class GraphicPipeline:
     ICON_SCALE = 1/16
 
     def __init__(self, world, agent_visualization, display=False):
-        pygame.init()
+        # only the pygame modules used for drawing are initialized, converting sprites needs the display module even
+        # if no window is opened
+        pygame.display.init()
+        pygame.font.init()
         self.world = world
         self.display = display
         self.screen = None
@@ -58,40 +61,126 @@ class GraphicPipeline:
         path = pathlib.Path(dir_name)
         self.root_dir = path.parent.parent
         self.font = None
+        self.sprites = {}
+        self.background = None
+        self.static_objects = []
+        self.dynamic_objects = []
+        self.static_keys = None
+        self.tile_keys = {}
+        self.tracker = None
+        self.structure_version = -1
 
     def initialize(self):
         if self.display:
             self.screen = pygame.display.set_mode((self.graphics_properties.width_pixel,
                                                    self.graphics_properties.height_pixel))
+            pygame.display.set_caption('Cooking Zoo')
         else:
-            # Create a hidden surface
+            # Create a hidden surface, no display is needed to render into it
             self.screen = pygame.Surface((self.graphics_properties.width_pixel, self.graphics_properties.height_pixel))
-        self.screen = self.screen
-        pygame.display.set_caption('Cooking Zoo')
         self.font = pygame.font.Font('freesansbold.ttf', 18)
+        self.build_sprite_atlas()
         return True
 
-    def render(self, display):
-        self.screen.fill(Color.FLOOR)
-
-        self.draw_static_objects()
+    def build_sprite_atlas(self):
+        # scales every asset once to the sizes used for tiles, held and plated objects and orientation arrows
+        tile_size = self.graphics_properties.tile_size
+        sizes = [tile_size, self.graphics_properties.holding_size, self.graphics_properties.container_size,
+                 self.graphics_properties.holding_container_size, (tile_size[0] // 4, tile_size[1] // 4)]
+        for asset in sorted(pathlib.Path(self.root_dir, self.graphics_dir).glob("*.png")):
+            for size in sizes:
+                self.sprite(asset.stem, size)
+
+    def sprite(self, name, size):
+        key = (name, int(size[0]), int(size[1]))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            image = get_image(f'{self.root_dir}/{self.graphics_dir}/{name}.png')
+            sprite = pygame.transform.scale(image, key[1:])
+            if not sprite.get_flags() & pygame.SRCALPHA or pygame.surfarray.pixels_alpha(sprite).min() == 255:
+                # opaque sprites are converted to the format of the screen, which makes blitting them much cheaper
+                sprite = sprite.convert(self.screen)
+            self.sprites[key] = sprite
+        return sprite
+
+    def get_frame(self):
+        """Return the current frame as a height x width x 3 uint8 array"""
+        pixels = pygame.surfarray.pixels3d(self.screen)
+        # the surface is locked while the pixel view exists, the frame is copied once into its own array
+        frame = np.ascontiguousarray(pixels.transpose(1, 0, 2))
+        del pixels
+        return frame
 
-        self.draw_agents()
-
-        self.draw_dynamic_objects()
+    def render(self, display):
+        background_changed = self.update_background()
+        tile_keys = self.foreground_keys()
+        if background_changed:
+            self.draw_agents()
+            self.draw_dynamic_objects()
+            dirty_rects = None
+        else:
+            dirty_rects = self.redraw_dirty_tiles(tile_keys)
+        self.tile_keys = tile_keys
 
         if display:
-            pygame.display.flip()
-            pygame.display.update()
+            if dirty_rects is None:
+                pygame.display.update()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
             pygame.event.get()
 
+    def update_background(self):
+        """Redraw the cached layer of floor and static objects if one of them looks different, return if it did"""
+        tracker = self.world.object_tracker
+        if tracker is not self.tracker or tracker.structure_version != self.structure_version:
+            self.tracker = tracker
+            self.structure_version = tracker.structure_version
+            objects = self.world.get_object_list()
+            self.static_objects = [obj for obj in objects if isinstance(obj, StaticObject)]
+            self.dynamic_objects = [obj for obj in objects if isinstance(obj, DynamicObject)]
+            self.static_keys = None
+        static_keys = [(obj.file_name(), obj.display_text(), tuple(obj.icons())) for obj in self.static_objects]
+        if static_keys == self.static_keys:
+            return False
+        self.static_keys = static_keys
+        self.screen.fill(Color.FLOOR)
+        self.draw_static_objects()
+        if self.background is None or self.background.get_size() != self.screen.get_size():
+            self.background = self.screen.copy()
+        else:
+            self.background.blit(self.screen, (0, 0))
+        return True
+
+    def foreground_keys(self):
+        """Describe everything drawn over the background per tile, tiles with an unchanged key need no redraw"""
+        tile_keys = defaultdict(list)
+        for idx, agent in enumerate(self.world.relevant_agents):
+            tile_keys[agent.location].append((self.agent_visualization[idx], agent.color, agent.orientation,
+                                              agent.display_text(), tuple(agent.icons())))
+        agent_locations = {agent.location for agent in self.world.agents}
+        for obj in self.dynamic_objects:
+            tile_keys[obj.location].append((type(obj), obj.file_name(), obj.display_text(), tuple(obj.icons()),
+                                            obj.location in agent_locations))
+        return tile_keys
+
+    def redraw_dirty_tiles(self, tile_keys):
+        dirty_tiles = {location for location in tile_keys.keys() | self.tile_keys.keys()
+                       if tile_keys.get(location) != self.tile_keys.get(location)}
+        dirty_rects = []
+        for location in dirty_tiles:
+            rect = pygame.Rect(self.scaled_location(location), self.graphics_properties.tile_size)
+            self.screen.blit(self.background, rect, rect)
+            dirty_rects.append(rect)
+        # everything drawn over the background stays within its tile, the dirty tiles can be redrawn on their own
+        self.draw_agents(dirty_tiles)
+        self.draw_dynamic_objects(dirty_tiles)
+        return dirty_rects
+
     def draw_square(self):
         pass
 
     def draw_static_objects(self):
-        objects = self.world.get_object_list()
-        static_objects = [obj for obj in objects if isinstance(obj, StaticObject)]
-        for static_object in static_objects:
+        for static_object in self.static_objects:
             self.draw_static_object(static_object)
 
     def draw_static_object(self, static_object: StaticObject):
@@ -108,12 +197,11 @@ class GraphicPipeline:
             self.draw(static_object.file_name(), self.graphics_properties.tile_size, sl,
                       static_object.display_text(), static_object.icons())
 
-    def draw_dynamic_objects(self):
-        objects = self.world.get_object_list()
-        dynamic_objects = [obj for obj in objects if isinstance(obj, DynamicObject)]
+    def draw_dynamic_objects(self, locations=None):
         dynamic_objects_grouped = defaultdict(list)
-        for obj in dynamic_objects:
-            dynamic_objects_grouped[obj.location].append(obj)
+        for obj in self.dynamic_objects:
+            if locations is None or obj.location in locations:
+                dynamic_objects_grouped[obj.location].append(obj)
         for location, obj_list in dynamic_objects_grouped.items():
             if any([agent.location == location for agent in self.world.agents]):
                 self.draw_dynamic_object_stack(obj_list, self.graphics_properties.holding_size,
@@ -137,8 +225,10 @@ class GraphicPipeline:
         else:
             self.draw_food_stack(dynamic_objects, base_size, base_location)
 
-    def draw_agents(self):
+    def draw_agents(self, locations=None):
         for idx, agent in enumerate(self.world.relevant_agents):
+            if locations is not None and agent.location not in locations:
+                continue
             agent_string = self.agent_visualization[idx]
             self.draw(f'{agent_string}-{agent.color}', self.graphics_properties.tile_size,
                       self.scaled_location(agent.location), agent.display_text(), agent.icons())
@@ -169,9 +259,7 @@ class GraphicPipeline:
             self.draw(file_name, size, location, "", [])
 
     def draw(self, path, size, location, text, icons):
-        image_path = f'{self.root_dir}/{self.graphics_dir}/{path}.png'
-        image = pygame.transform.scale(get_image(image_path), (int(size[0]), int(size[1])))
-        self.screen.blit(image, location)
+        self.screen.blit(self.sprite(path, size), location)
 
         if text:
             text_surface_object = self.font.render()
@@ -180,12 +268,10 @@ class GraphicPipeline:
             self.screen.blit(text_surface_object, text_field)
 
         for idx, icon in enumerate(icons):
-            icon_path = f'{self.root_dir}/{self.graphics_dir}/{icon}.png'
             icon_size = (int(int(size[0]) * self.ICON_SCALE), int(int(size[1]) * self.ICON_SCALE))
             icon_tiles = int(math.sqrt(1 / self.ICON_SCALE))
             new_loc = (location[0] + size[0] * (idx % icon_tiles), location[1] + size[1] * (idx // icon_tiles))
-            icon_image = pygame.transform.scale(get_image(icon_path), icon_size)
-            self.screen.blit(icon_image, new_loc)
+            self.screen.blit(self.sprite(icon, icon_size), new_loc)
 
     def draw_food_stack(self, dynamic_objects, base_size, base_loc):
         tiles = int(math.floor(math.sqrt(len(dynamic_objects) - 1)) + 1)
@@ -0,0 +1,164 @@
+from cooking_zoo.cooking_world.world_objects import StaticObject, DynamicObject, ContentObject, Deliversquare
+from cooking_zoo.environment.game.colors import Color
+
+import numpy as np
+import pathlib
+import math
+
+ASSET_DIR = pathlib.Path(__file__).parent / "graphics" / "assets"
+
+
+def load_sprite(name, width, height):
+    """Returns the asset scaled to width x height as float32 colours (height x width x 3) and alpha (height x width x 1)"""
+    # pygame is only needed to decode and scale the assets, it is imported on first use to keep imports light
+    import pygame
+    image = pygame.image.load(str(ASSET_DIR / f"{name}.png"))
+    if not image.get_flags() & pygame.SRCALPHA:
+        # paletted assets have no alpha channel, copying them onto a transparent surface makes them opaque
+        rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+        rgba.blit(image, (0, 0))
+        image = rgba
+    scaled = pygame.transform.smoothscale(image, (width, height))
+    colors = pygame.surfarray.array3d(scaled).transpose(1, 0, 2).astype(np.float32)
+    alpha = pygame.surfarray.array_alpha(scaled).T[:, :, None].astype(np.float32) / 255
+    return colors, alpha
+
+
+class ImageObservationBuilder:
+    """Renders worlds into (height * tile_size) x (width * tile_size) x 3 uint8 images without pygame surfaces.
+
+    The layout follows GraphicPipeline at a small tile size: static objects on their counter, agents with an
+    orientation arrow and stacks of dynamic objects, held ones scaled into the corner of the agent. Every distinct tile
+    content is composited once from the scaled sprites with NumPy and cached; a batch of worlds is then assembled by
+    gathering the cached tiles of all cells of all worlds at once. Display texts and icons are not drawn.
+    """
+
+    HOLDING_SCALE = 0.5
+    CONTAINER_SCALE = 0.7
+
+    def __init__(self, tile_size=12, agent_visualization=None):
+        self.tile_size = tile_size
+        self.agent_visualization = agent_visualization
+        self.sprites = {}
+        self.tile_ids = {}
+        self.tiles = np.zeros((16, tile_size, tile_size, 3), dtype=np.uint8)
+        self.floor = np.broadcast_to(np.asarray(Color.FLOOR, dtype=np.float32), (tile_size, tile_size, 3))
+        self.delivery = np.broadcast_to(np.asarray(Color.DELIVERY, dtype=np.float32), (tile_size, tile_size, 3))
+
+    def image_shape(self, world):
+        return world.height * self.tile_size, world.width * self.tile_size, 3
+
+    def observation(self, world):
+        """Returns the image of a single world"""
+        return self.frames([world])[0]
+
+    def frames(self, worlds, out=None):
+        """Returns the images of worlds of equal size as one (num_worlds x height x width x 3) uint8 array"""
+        height, width, _ = self.image_shape(worlds[0])
+        grid = np.stack([self.tile_grid(world) for world in worlds])
+        if out is None:
+            out = np.empty((len(worlds), height, width, 3), dtype=np.uint8)
+        tile_size = self.tile_size
+        tiled = out.reshape(len(worlds), grid.shape[1], tile_size, grid.shape[2], tile_size, 3)
+        tiled[:] = self.tiles[grid].transpose(0, 1, 3, 2, 4, 5)
+        return out
+
+    def tile_grid(self, world):
+        """Returns the (height x width) ids of the cached tiles showing the cells of the world"""
+        # per cell the static objects, agents and dynamic objects in the order GraphicPipeline draws them
+        keys = {}
+        agent_visualization = self.agent_visualization or ["human"] * len(world.agents)
+        for idx, agent in enumerate(world.relevant_agents):
+            keys.setdefault(agent.location, [[], [], []])[1].append((f'{agent_visualization[idx]}-{agent.color}',
+                                                                     agent.orientation))
+        agent_locations = {agent.location for agent in world.agents}
+        for obj in world.get_object_list():
+            if isinstance(obj, StaticObject):
+                keys.setdefault(obj.location, [[], [], []])[0].append((isinstance(obj, Deliversquare), obj.file_name()))
+            elif isinstance(obj, DynamicObject):
+                keys.setdefault(obj.location, [[], [], []])[2].append((obj.file_name(), isinstance(obj, ContentObject),
+                                                                       obj.location in agent_locations))
+        grid = np.zeros((world.height, world.width), dtype=np.int64)
+        grid.fill(self.tile_id(((), (), ())))
+        for (x, y), (static, agents, dynamic) in keys.items():
+            grid[y, x] = self.tile_id((tuple(static), tuple(agents), tuple(dynamic)))
+        return grid
+
+    def tile_id(self, key):
+        tile_id = self.tile_ids.get(key)
+        if tile_id is None:
+            tile_id = len(self.tile_ids)
+            if tile_id == len(self.tiles):
+                self.tiles = np.concatenate([self.tiles, np.zeros_like(self.tiles)])
+            self.tiles[tile_id] = self.composite_tile(*key)
+            self.tile_ids[key] = tile_id
+        return tile_id
+
+    def composite_tile(self, static, agents, dynamic):
+        tile_size = self.tile_size
+        canvas = self.floor.copy()
+        for is_delivery, file_name in static:
+            if is_delivery:
+                canvas[:] = self.delivery
+            else:
+                self.blend(canvas, "Counter", (tile_size, tile_size), (0, 0))
+            self.blend(canvas, file_name, (tile_size, tile_size), (0, 0))
+        arrow_size = (tile_size // 4, tile_size // 4)
+        arrow_locations = {1: ("arrow_left", (0, tile_size // 4)),
+                           2: ("arrow_right", (3 * tile_size // 4, tile_size // 4)),
+                           3: ("arrow_down", (tile_size // 4, 3 * tile_size // 4)),
+                           4: ("arrow_up", (tile_size // 4, 0))}
+        for file_name, orientation in agents:
+            self.blend(canvas, file_name, (tile_size, tile_size), (0, 0))
+            if orientation not in arrow_locations:
+                raise ValueError(f"Agent orientation invalid ({orientation})")
+            arrow, location = arrow_locations[orientation]
+            self.blend(canvas, arrow, arrow_size, location)
+        if dynamic:
+            self.blend_stack(canvas, dynamic)
+        return np.rint(canvas).astype(np.uint8)
+
+    def blend_stack(self, canvas, dynamic):
+        tile_size = self.tile_size
+        held = dynamic[0][2]
+        if held:
+            base_size = tile_size * self.HOLDING_SCALE
+            base_location = tile_size * (1 - self.HOLDING_SCALE)
+            stack_size = tile_size * self.CONTAINER_SCALE * self.HOLDING_SCALE
+            stack_location = tile_size * ((1 - self.HOLDING_SCALE) + (1 - self.CONTAINER_SCALE) / 2 *
+                                          self.HOLDING_SCALE)
+        else:
+            base_size = tile_size
+            base_location = 0
+            stack_size = tile_size * self.CONTAINER_SCALE
+            stack_location = tile_size * (1 - self.CONTAINER_SCALE) / 2
+        containers = [entry for entry in dynamic if entry[1]]
+        if len(containers) == 1:
+            size = (int(base_size), int(base_size))
+            self.blend(canvas, containers[0][0], size, (int(base_location), int(base_location)))
+            rest = [entry for entry in dynamic if entry is not containers[0]]
+            if rest:
+                self.blend_food_stack(canvas, rest, stack_size, int(stack_location))
+        else:
+            self.blend_food_stack(canvas, dynamic, base_size, int(base_location))
+
+    def blend_food_stack(self, canvas, dynamic, base_size, base_location):
+        tiles = int(math.floor(math.sqrt(len(dynamic) - 1)) + 1)
+        size = int(base_size // tiles)
+        for idx, (file_name, _, _) in enumerate(dynamic):
+            location = (base_location + size * (idx % tiles), base_location + size * (idx // tiles))
+            self.blend(canvas, file_name, (size, size), location)
+
+    def blend(self, canvas, name, size, location):
+        width, height = int(size[0]), int(size[1])
+        if width <= 0 or height <= 0:
+            return
+        key = (name, width, height)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = load_sprite(name, width, height)
+            self.sprites[key] = sprite
+        colors, alpha = sprite
+        x, y = location
+        region = canvas[y:y + height, x:x + width]
+        region += alpha * (colors - region)
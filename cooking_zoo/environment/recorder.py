@@ -0,0 +1,120 @@
+from cooking_zoo.environment.cooking_env import FPS
+
+import numpy as np
+import importlib
+import os
+import queue
+import threading
+
+
+def write_npz(path, frames, fps):
+    np.savez_compressed(path, frames=np.stack(frames), fps=fps)
+
+
+def write_gif(path, frames, fps):
+    from PIL import Image
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=int(round(1000 / fps)), loop=0)
+
+
+def write_mp4(path, frames, fps):
+    import imageio
+    imageio.mimwrite(path, frames, fps=fps)
+
+
+WRITERS = {"npz": write_npz, "gif": write_gif, "mp4": write_mp4}
+REQUIRED_MODULES = {"gif": "PIL.Image", "mp4": "imageio"}
+
+
+class EpisodeRecorder:
+    """Writes the rendered frames of episodes to disk in a background thread.
+
+    Frames, e.g. from render() of an environment in the rgb_array render mode, are handed over through a bounded
+    queue, so capture() only blocks if the writer falls max_queue frames behind. When an episode ends its frames are
+    encoded as a compressed npz archive, a gif (requires Pillow) or an mp4 (requires imageio) named after the episode.
+    Errors of the writer are raised by the next call of the recorder.
+    """
+
+    def __init__(self, directory, video_format="npz", fps=FPS, max_queue=256, copy=True):
+        assert video_format in WRITERS, f"Selected invalid video format. Allowed {list(WRITERS)}"
+        if video_format in REQUIRED_MODULES:
+            importlib.import_module(REQUIRED_MODULES[video_format])
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.video_format = video_format
+        self.fps = fps
+        self.copy = copy
+        self.num_episodes = 0
+        self.episode_path = None
+        self.error = None
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self.write, daemon=True)
+        self.thread.start()
+        self.closed = False
+
+    def start_episode(self, name=None):
+        """Starts recording into <directory>/<name>.<video_format>, ending the current episode first"""
+        if self.episode_path is not None:
+            self.end_episode()
+        name = name or f"episode_{self.num_episodes:05d}"
+        self.episode_path = os.path.join(self.directory, f"{name}.{self.video_format}")
+        self.num_episodes += 1
+
+    def capture(self, frame):
+        """Queues a height x width x 3 uint8 frame of the current episode"""
+        self.raise_error()
+        if self.episode_path is None:
+            self.start_episode()
+        frame = np.array(frame, dtype=np.uint8, copy=self.copy or None)
+        self.queue.put((self.episode_path, frame))
+
+    def end_episode(self):
+        """Returns the path the episode is written to, writing happens in the background"""
+        self.raise_error()
+        path = self.episode_path
+        if path is not None:
+            self.queue.put((path, None))
+        self.episode_path = None
+        return path
+
+    def flush(self):
+        """Blocks until all queued frames and episodes are written"""
+        self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        if self.closed:
+            return
+        self.end_episode()
+        # at interpreter shutdown the writer may already be gone
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.closed = True
+        self.raise_error()
+
+    def raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def write(self):
+        frames = {}
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    break
+                path, frame = item
+                if frame is not None:
+                    frames.setdefault(path, []).append(frame)
+                elif path in frames:
+                    WRITERS[self.video_format](path, frames.pop(path), self.fps)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
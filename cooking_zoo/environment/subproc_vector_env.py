@@ -0,0 +1,197 @@
+from cooking_zoo.environment import cooking_env
+from multiprocessing import shared_memory
+
+import multiprocessing as mp
+import numpy as np
+import gymnasium as gym
+import random
+
+
+def create_buffers(specs):
+    shms = {}
+    buffers = {}
+    for name, (shape, dtype) in specs.items():
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shms[name] = shared_memory.SharedMemory(create=True, size=size)
+        buffers[name] = np.ndarray(shape, dtype=dtype, buffer=shms[name].buf)
+        buffers[name].fill(0)
+    return shms, buffers
+
+
+def attach_buffers(specs):
+    shms = {}
+    buffers = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shms[name] = shared_memory.SharedMemory(name=shm_name)
+        buffers[name] = np.ndarray(shape, dtype=dtype, buffer=shms[name].buf)
+    return shms, buffers
+
+
+def write_step(buffers, env_idx, possible_agents, obs, rewards=None, terminations=None, truncations=None):
+    for agent_idx, agent in enumerate(possible_agents):
+        if agent in obs:
+            buffers["observations"][env_idx, agent_idx] = obs[agent]
+        else:
+            buffers["observations"][env_idx, agent_idx] = 0
+        buffers["rewards"][env_idx, agent_idx] = rewards.get(agent, 0) if rewards else 0
+        buffers["terminations"][env_idx, agent_idx] = terminations.get(agent, False) if terminations else False
+        buffers["truncations"][env_idx, agent_idx] = truncations.get(agent, False) if truncations else False
+
+
+def worker(remote, parent_remote, buffer_specs, env_indices, env_kwargs, full_reset):
+    parent_remote.close()
+    shms, buffers = attach_buffers(buffer_specs)
+    envs = [cooking_env.parallel_env(**env_kwargs) for _ in env_indices]
+    possible_agents = envs[0].possible_agents
+    try:
+        while True:
+            command, data = remote.recv()
+            try:
+                if command == "reset":
+                    seed, options = data
+                    for env_idx, env in zip(env_indices, envs):
+                        if seed is not None:
+                            # level generation and agent spawning draw from the global generators of the worker
+                            random.seed(seed + env_idx)
+                            np.random.seed(seed + env_idx)
+                        obs, _ = env.reset(options=options)
+                        write_step(buffers, env_idx, possible_agents, obs)
+                        buffers["episode_done"][env_idx] = False
+                    remote.send((True, None))
+                elif command == "step":
+                    for env_idx, env, actions in zip(env_indices, envs, data):
+                        action_dict = {agent: int(actions[agent_idx]) for agent_idx, agent in enumerate(possible_agents)
+                                       if agent in env.agents}
+                        obs, rewards, terminations, truncations, _ = env.step(action_dict)
+                        write_step(buffers, env_idx, possible_agents, obs, rewards, terminations, truncations)
+                        done = not env.agents or all(terminations[agent] or truncations[agent]
+                                                     for agent in terminations)
+                        buffers["episode_done"][env_idx] = done
+                        if done:
+                            buffers["final_observations"][env_idx] = buffers["observations"][env_idx]
+                            obs, _ = env.reset(options={"full_reset": full_reset})
+                            for agent_idx, agent in enumerate(possible_agents):
+                                buffers["observations"][env_idx, agent_idx] = obs[agent] if agent in obs else 0
+                    remote.send((True, None))
+                elif command == "close":
+                    remote.send((True, None))
+                    break
+                else:
+                    raise ValueError(f"Unknown command {command}")
+            except Exception as e:
+                remote.send((False, e))
+    finally:
+        buffers.clear()
+        for shm in shms.values():
+            shm.close()
+
+
+class SubprocVectorCookingEnv:
+    """Runs copies of cooking_env.parallel_env in worker processes.
+
+    The worlds are split evenly over the workers. Workers write observations, rewards, terminations and truncations
+    straight into multiprocessing.shared_memory arrays with one row per world, so only the small action arrays are sent
+    over the pipes. Only the feature_vector observation space has a fixed size and is supported. Finished worlds are
+    reset automatically, the observation of their last step is returned in infos["final_observation"] next to the
+    infos["_final_observation"] mask. Resetting with a seed seeds the worker with seed + index of a world before that
+    world is reset, as VectorCookingEnv does.
+    """
+
+    def __init__(self, num_envs, level, meta_file, num_agents, max_steps, recipes, num_workers=None,
+                 end_condition_all_dishes=False, action_scheme="scheme1", reward_scheme=None, agent_respawn_rate=0.0,
+                 grace_period=20, agent_despawn_rate=0.0, full_reset=True, copy=True, context=None):
+        env_kwargs = dict(level=level, meta_file=meta_file, num_agents=num_agents, max_steps=max_steps,
+                          recipes=recipes, obs_spaces=["feature_vector"] * num_agents,
+                          end_condition_all_dishes=end_condition_all_dishes, action_scheme=action_scheme,
+                          reward_scheme=reward_scheme, agent_respawn_rate=agent_respawn_rate,
+                          grace_period=grace_period, agent_despawn_rate=agent_despawn_rate)
+        prototype_env = cooking_env.parallel_env(**env_kwargs)
+        self.possible_agents = prototype_env.possible_agents[:]
+        self.single_observation_space = prototype_env.observation_space(self.possible_agents[0])
+        self.single_action_space = prototype_env.action_space(self.possible_agents[0])
+        prototype_env.close()
+        self.num_envs = num_envs
+        self.num_agents = num_agents
+        self.copy = copy
+        self.action_space = gym.spaces.MultiDiscrete(np.full((num_envs, num_agents), self.single_action_space.n))
+
+        observation_shape = (num_envs, num_agents) + self.single_observation_space.shape
+        specs = {"observations": (observation_shape, np.float32),
+                 "final_observations": (observation_shape, np.float32),
+                 "rewards": ((num_envs, num_agents), np.float32),
+                 "terminations": ((num_envs, num_agents), bool),
+                 "truncations": ((num_envs, num_agents), bool),
+                 "episode_done": ((num_envs,), bool)}
+        self.shms, self.buffers = create_buffers(specs)
+        buffer_specs = {name: (self.shms[name].name, shape, dtype) for name, (shape, dtype) in specs.items()}
+
+        num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        self.worker_env_indices = [indices.tolist() for indices in np.array_split(np.arange(num_envs), num_workers)]
+        ctx = mp.get_context(context)
+        self.remotes = []
+        self.processes = []
+        for env_indices in self.worker_env_indices:
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(target=worker, args=(worker_remote, remote, buffer_specs, env_indices, env_kwargs,
+                                                       full_reset), daemon=True)
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+
+    def reset(self, seed=None, options=None):
+        options = options or {"full_reset": True}
+        for remote in self.remotes:
+            remote.send(("reset", (seed, options)))
+        self.wait()
+        return self.returned(self.buffers["observations"]), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        assert actions.shape == (self.num_envs, self.num_agents), \
+            f"Expected actions of shape {(self.num_envs, self.num_agents)}, got {actions.shape}"
+        for remote, env_indices in zip(self.remotes, self.worker_env_indices):
+            remote.send(("step", actions[env_indices[0]:env_indices[-1] + 1]))
+        self.wait()
+        infos = {}
+        episode_done = self.buffers["episode_done"]
+        if episode_done.any():
+            infos = {"final_observation": self.buffers["final_observations"].copy(),
+                     "_final_observation": episode_done.copy()}
+        return self.returned(self.buffers["observations"]), self.returned(self.buffers["rewards"]), \
+            self.returned(self.buffers["terminations"]), self.returned(self.buffers["truncations"]), infos
+
+    def wait(self):
+        errors = []
+        for remote in self.remotes:
+            success, payload = remote.recv()
+            if not success:
+                errors.append(payload)
+        if errors:
+            raise errors[0]
+
+    def returned(self, array):
+        return array.copy() if self.copy else array
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+                remote.recv()
+            except (BrokenPipeError, EOFError):
+                # the worker is already gone, e.g. at interpreter shutdown
+                pass
+        for process in self.processes:
+            process.join()
+        self.buffers.clear()
+        for shm in self.shms.values():
+            shm.close()
+            shm.unlink()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
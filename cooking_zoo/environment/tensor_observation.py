@@ -0,0 +1,85 @@
+from cooking_zoo.cooking_world.world_objects import GAME_CLASSES
+
+import numpy as np
+
+
+class TensorObservationBuilder:
+    """Maintains the width x height x graph_representation_length tensor of the "full" observation space.
+
+    Every class of GAME_CLASSES owns state_length() consecutive channels, in which the objects of that class add their
+    numeric_state_representation() at their cell. The tensor is updated incrementally: the builder remembers what every
+    object contributed and only replaces the contributions of objects that moved or changed since the last update.
+    A change of the object structure rebuilds the tensor in place. Observations are read-only copies of the tensor,
+    one per change, so all agents of a step share the same array and observations kept from earlier steps stay intact.
+    """
+
+    dtype = np.int8
+
+    def __init__(self):
+        self.channel_offsets = {}
+        offset = 0
+        for cls in GAME_CLASSES:
+            self.channel_offsets[cls] = offset
+            offset += cls.state_length()
+        self.graph_representation_length = offset
+        self.tensor = None
+        self.observation_copy = None
+        self.contributions = {}
+        self.tracker = None
+        self.change_set = None
+        self.structure_version = -1
+
+    def observation(self, world):
+        """Returns a read-only copy of the tensor, shared by all calls until the tensor changes."""
+        tracker = world.object_tracker
+        if tracker is not self.tracker or tracker.structure_version != self.structure_version:
+            self.rebuild(world)
+        else:
+            for obj in self.change_set:
+                if obj in self.contributions:
+                    self.refresh(obj)
+            self.change_set.clear()
+        for agent, active in zip(world.agents, world.active_agents):
+            if active:
+                self.refresh(agent)
+            elif agent in self.contributions:
+                self.subtract(*self.contributions.pop(agent))
+        if self.observation_copy is None:
+            self.observation_copy = self.tensor.copy()
+            self.observation_copy.flags.writeable = False
+        return self.observation_copy
+
+    def rebuild(self, world):
+        shape = (world.width, world.height, self.graph_representation_length)
+        if self.tensor is None or self.tensor.shape != shape:
+            self.tensor = np.zeros(shape, dtype=self.dtype)
+        else:
+            self.tensor.fill(0)
+        self.observation_copy = None
+        tracker = world.object_tracker
+        if tracker is not self.tracker:
+            self.tracker = tracker
+            self.change_set = tracker.register_change_set()
+        self.structure_version = tracker.structure_version
+        self.change_set.clear()
+        self.contributions = {}
+        for obj_list in world.world_objects.values():
+            for obj in obj_list:
+                self.refresh(obj)
+
+    def refresh(self, obj):
+        old_contribution = self.contributions.get(obj)
+        x, y = obj.location
+        start = self.channel_offsets[type(obj)]
+        values = obj.numeric_state_representation()
+        if old_contribution == (x, y, start, values):
+            return
+        if old_contribution is not None:
+            self.subtract(*old_contribution)
+        self.tensor[x, y, start:start + len(values)] += values
+        self.contributions[obj] = (x, y, start, values)
+        self.observation_copy = None
+
+    def subtract(self, x, y, start, values):
+        self.tensor[x, y, start:start + len(values)] -= values
+        self.observation_copy = None
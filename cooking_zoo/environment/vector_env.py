@@ -0,0 +1,139 @@
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+
+import numpy as np
+import gymnasium as gym
+import random
+
+
+class VectorCookingEnv:
+    """Steps many cooking worlds at once without the PettingZoo wrappers.
+
+    The worlds are driven through CookingEnvironment.accumulated_step, which skips the AEC agent selection. Actions are
+    given as one (num_envs x num_agents) array; actions of inactive agents are ignored. Observations, rewards,
+    terminations and truncations are returned as stacked arrays with one row per world. A world whose episode finished
+    is reset automatically, the observation of its last step is stored in infos["final_observation"]. The "image"
+    observations of all worlds are rendered together as one (num_envs x height x width x 3) batch. Resetting with a seed
+    seeds the global generators with seed + index of the world before the world is reset.
+    """
+
+    allowed_obs_spaces = ["feature_vector", "full", "image"]
+
+    def __init__(self, num_envs, level, meta_file, num_agents, max_steps, recipes, obs_space="feature_vector",
+                 end_condition_all_dishes=False, allowed_objects=None, action_scheme="scheme1", reward_scheme=None,
+                 agent_respawn_rate=0.0, grace_period=20, agent_despawn_rate=0.0, full_reset=True, copy=True,
+                 image_tile_size=12):
+        assert obs_space in self.allowed_obs_spaces, \
+            f"Selected invalid obs space. Allowed {self.allowed_obs_spaces}"
+        self.num_envs = num_envs
+        self.num_agents = num_agents
+        self.obs_space = obs_space
+        self.full_reset = full_reset
+        self.copy = copy
+        self.envs = [CookingEnvironment(level, meta_file, num_agents, max_steps, recipes,
+                                        obs_spaces=[obs_space] * num_agents,
+                                        end_condition_all_dishes=end_condition_all_dishes,
+                                        allowed_objects=allowed_objects, action_scheme=action_scheme,
+                                        reward_scheme=reward_scheme, agent_respawn_rate=agent_respawn_rate,
+                                        grace_period=grace_period, agent_despawn_rate=agent_despawn_rate,
+                                        image_tile_size=image_tile_size)
+                     for _ in range(num_envs)]
+        first_env = self.envs[0]
+        self.possible_agents = first_env.possible_agents[:]
+        self.single_observation_space = first_env.observation_space(self.possible_agents[0])
+        self.single_action_space = first_env.action_space(self.possible_agents[0])
+        self.action_space = gym.spaces.MultiDiscrete(np.full((num_envs, num_agents), self.single_action_space.n))
+
+        # the worlds share one image renderer and with it the cache of composited tiles
+        self.image_observation_builder = first_env.image_observation_builder
+        if obs_space == "feature_vector":
+            self.observations = np.zeros((num_envs, num_agents, first_env.feature_vector_representation_length),
+                                         dtype=np.float32)
+        elif obs_space == "image":
+            self.observations = np.zeros((num_envs,) + self.single_observation_space.shape, dtype=np.uint8)
+        else:
+            tensor_shape = self.single_observation_space["feature_vector"].shape
+            self.observations = {"feature_vector": np.zeros((num_envs,) + tensor_shape,
+                                                            dtype=first_env.tensor_observation_builder.dtype),
+                                 "agent_location": np.zeros((num_envs, num_agents, 2), dtype=np.int32),
+                                 "goal_vector": np.zeros((num_envs, num_agents, first_env.num_goals), dtype=np.int8)}
+        self.rewards = np.zeros((num_envs, num_agents), dtype=np.float32)
+        self.terminations = np.zeros((num_envs, num_agents), dtype=bool)
+        self.truncations = np.zeros((num_envs, num_agents), dtype=bool)
+
+    def reset(self, seed=None, options=None):
+        options = options or {"full_reset": True}
+        for idx, env in enumerate(self.envs):
+            if seed is not None:
+                # level generation and agent spawning draw from the global generators
+                random.seed(seed + idx)
+                np.random.seed(seed + idx)
+            env.reset(options=options)
+            self.write_observation(idx, env)
+        self.write_image_observations()
+        return self.returned(self.observations), [env.infos for env in self.envs]
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        assert actions.shape == (self.num_envs, self.num_agents), \
+            f"Expected actions of shape {(self.num_envs, self.num_agents)}, got {actions.shape}"
+        self.rewards.fill(0)
+        self.terminations.fill(False)
+        self.truncations.fill(False)
+        infos = [{} for _ in self.envs]
+        final_observations = {}
+        for idx, env in enumerate(self.envs):
+            env.accumulated_step([int(action) for action, active in zip(actions[idx], env.world.active_agents)
+                                  if active])
+            for agent_idx, agent in enumerate(self.possible_agents):
+                if agent in env.rewards:
+                    self.rewards[idx, agent_idx] = env.rewards[agent]
+                    self.terminations[idx, agent_idx] = env.terminations[agent]
+                    self.truncations[idx, agent_idx] = env.truncations[agent]
+            infos[idx] = env.infos
+            self.write_observation(idx, env)
+            if all(env.terminations[agent] or env.truncations[agent] for agent in env.terminations) \
+                    or not any(env.world.active_agents):
+                final_observations[idx] = self.observation_copy(idx, env)
+                env.reset(options={"full_reset": self.full_reset})
+                self.write_observation(idx, env)
+        self.write_image_observations()
+        if final_observations:
+            for idx, final_observation in final_observations.items():
+                infos[idx] = {**infos[idx], "final_observation": final_observation}
+        return self.returned(self.observations), self.returned(self.rewards), self.returned(self.terminations), \
+            self.returned(self.truncations), infos
+
+    def write_observation(self, idx, env):
+        if self.obs_space == "feature_vector":
+            self.observations[idx] = env.feature_vector_builder.agent_views(env.world)
+        elif self.obs_space == "image":
+            # rendered for all worlds at once in write_image_observations
+            pass
+        else:
+            self.observations["feature_vector"][idx] = env.tensor_observation_builder.observation(env.world)
+            for agent_idx, agent in enumerate(self.possible_agents):
+                self.observations["agent_location"][idx, agent_idx] = env.world_agent_mapping[agent].location
+                self.observations["goal_vector"][idx, agent_idx] = \
+                    env.recipe_mapping[agent].goals_completed(env.num_goals)
+
+    def write_image_observations(self):
+        if self.obs_space == "image":
+            self.image_observation_builder.frames([env.world for env in self.envs], out=self.observations)
+
+    def observation_copy(self, idx, env):
+        if self.obs_space == "feature_vector":
+            return self.observations[idx].copy()
+        if self.obs_space == "image":
+            return self.image_observation_builder.observation(env.world)
+        return {key: value[idx].copy() for key, value in self.observations.items()}
+
+    def returned(self, array):
+        if not self.copy:
+            return array
+        if isinstance(array, dict):
+            return {key: value.copy() for key, value in array.items()}
+        return array.copy()
+
+    def close(self):
+        for env in self.envs:
+            env.close()
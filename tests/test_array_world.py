@@ -0,0 +1,69 @@
+from cooking_zoo.cooking_world.actions import ActionScheme1, ActionScheme3
+from cooking_zoo.cooking_world.cooking_world import CookingWorld
+from cooking_zoo.cooking_world.engine.array_world import ArrayWorlds
+from cooking_zoo.cooking_world.engine.load_level import UTILS_DIR
+from cooking_zoo.cooking_world.engine.snapshot import SNAPSHOT_LAYOUTS
+
+import numpy as np
+import random
+import pytest
+
+
+LEVELS = sorted(path.stem for path in (UTILS_DIR / "level").glob("*.json"))
+NUM_WORLDS = 16
+NUM_AGENTS = 2
+NUM_STEPS = 300
+EPISODE_LENGTH = 100
+
+
+def create_worlds(level, action_scheme):
+    # optional objects make resets of a level differ, a batch holds the worlds with the objects of the first one
+    worlds = []
+    objects = None
+    while len(worlds) < NUM_WORLDS:
+        world = CookingWorld(action_scheme, "example")
+        world.load_level(level, NUM_AGENTS)
+        snapshot = world.snapshot()
+        if objects is None:
+            objects = (snapshot.type_names, snapshot.type_counts)
+        if (snapshot.type_names, snapshot.type_counts) == objects:
+            worlds.append(world)
+    return worlds
+
+
+def without_unique_ids(snapshot):
+    # created objects are numbered differently by the two engines
+    objects = tuple((type_id, tuple(value for attr, value in zip(SNAPSHOT_LAYOUTS[type_id], values)
+                                    if attr != "unique_id"))
+                    for type_id, values in snapshot.objects)
+    return snapshot._replace(objects=objects)
+
+
+@pytest.mark.parametrize("action_scheme", [ActionScheme1, ActionScheme3])
+@pytest.mark.parametrize("level", LEVELS)
+def test_array_worlds_match_object_engine_step_for_step(level, action_scheme):
+    random.seed(0)
+    np.random.seed(0)
+    worlds = create_worlds(level, action_scheme)
+    arrays = ArrayWorlds(worlds)
+    actions = np.random.RandomState(2).randint(len(action_scheme.ACTIONS), size=(NUM_STEPS, NUM_WORLDS, NUM_AGENTS))
+    for step, step_actions in enumerate(actions):
+        failed = set()
+        for idx, (world, world_actions) in enumerate(zip(worlds, step_actions)):
+            try:
+                world.world_step(world_actions.tolist())
+            except Exception:
+                failed.add(idx)
+        arrays.step(step_actions)
+        for idx, world in enumerate(worlds):
+            # a world in which the object engine raises has to be flagged by the arrays
+            assert arrays.invalid[idx] == (idx in failed), f"step {step} world {idx}"
+            if idx not in failed:
+                assert without_unique_ids(arrays.snapshot(idx)) == without_unique_ids(world.snapshot()), \
+                    f"step {step} world {idx}"
+        for idx, world in enumerate(worlds):
+            if idx in failed or step % EPISODE_LENGTH == EPISODE_LENGTH - 1:
+                world.load_level(level, NUM_AGENTS)
+                arrays.reset(idx, world.snapshot())
+                assert not arrays.invalid[idx]
+                assert without_unique_ids(arrays.snapshot(idx)) == without_unique_ids(world.snapshot())
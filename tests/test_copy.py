@@ -0,0 +1,43 @@
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+
+import numpy as np
+import random
+import copy
+import pickle
+
+
+RECIPE_NAMES = ["TomatoLettuceSalad", "CarrotBanana"]
+
+
+def rollout(env, actions):
+    random.seed(1)
+    np.random.seed(1)
+    outputs = []
+    for step_actions in actions:
+        env.accumulated_step(step_actions)
+        outputs.append((env.world.snapshot(), env.feature_vector_builder.agent_views(env.world).tobytes(),
+                        dict(env.rewards), [recipe.num_open_goals for recipe in env.recipe_graphs]))
+    return outputs
+
+
+def test_deep_copies_and_pickles_continue_like_the_environment():
+    random.seed(0)
+    np.random.seed(0)
+    env = CookingEnvironment("switch_test", "example", len(RECIPE_NAMES), 100, RECIPE_NAMES, action_scheme="scheme3",
+                             obs_spaces=["feature_vector"] * len(RECIPE_NAMES))
+    env.reset()
+    for step_actions in np.random.RandomState(0).randint(5, size=(20, 2)).tolist():
+        env.accumulated_step(step_actions)
+    env.feature_vector_builder.agent_views(env.world)
+
+    env_copy = copy.deepcopy(env)
+    # the copy has its own tracker, which its objects, observation builders and recipe evaluator follow
+    tracker = env_copy.world.object_tracker
+    assert tracker is not env.world.object_tracker
+    assert all(obj.tracker is tracker for obj_list in env_copy.world.world_objects.values() for obj in obj_list)
+    assert env_copy.feature_vector_builder.tracker is tracker
+    assert env_copy.recipe_evaluator.evaluator.tracker is tracker
+    env_pickle = pickle.loads(pickle.dumps(env))
+
+    actions = np.random.RandomState(1).randint(5, size=(60, 2)).tolist()
+    assert rollout(env_copy, actions) == rollout(env_pickle, actions) == rollout(env, actions)
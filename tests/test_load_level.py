@@ -0,0 +1,57 @@
+from cooking_zoo.cooking_world.engine import load_level
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+
+import numpy as np
+import random
+import os
+import pytest
+
+
+RECIPE_NAMES = ["TomatoLettuceSalad", "CarrotBanana"]
+
+
+def create_env():
+    return CookingEnvironment("coop_test", "example", len(RECIPE_NAMES), 100, RECIPE_NAMES, action_scheme="scheme3",
+                              obs_spaces=["symbolic"] * len(RECIPE_NAMES))
+
+
+def world_objects(env):
+    return [obj for obj_list in env.world.world_objects.values() for obj in obj_list] + env.world.agents
+
+
+def test_resets_do_not_touch_the_file_system(monkeypatch):
+    env = create_env()
+    calls = []
+    stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: calls.append(args) or stat(*args, **kwargs))
+    for _ in range(5):
+        env.reset()
+        env.reset(options={"full_reset": False})
+    assert not calls
+    create_env()
+    assert calls
+
+
+def test_envs_of_a_level_do_not_share_object_state():
+    random.seed(0)
+    np.random.seed(0)
+    first_env, second_env = create_env(), create_env()
+    compiled_level = load_level._compiled_levels[load_level.level_file("coop_test")][1]
+    with pytest.raises(TypeError):
+        compiled_level.static_objects[0]["Cutboard"]["COUNT"] = 2
+    first_env.reset()
+    second_env.reset()
+    assert not {id(obj) for obj in world_objects(first_env)} & {id(obj) for obj in world_objects(second_env)}
+    second_snapshot = second_env.world.snapshot()
+
+    rng = np.random.RandomState(0)
+    start_snapshot = first_env.snapshot()
+    for t in range(300):
+        if t % 100 == 50:
+            first_env.restore(start_snapshot)
+        elif t % 100 == 99:
+            first_env.reset(options={"full_reset": t < 200})
+        else:
+            first_env.accumulated_step(rng.randint(len(first_env.action_scheme_class.ACTIONS), size=2).tolist())
+    assert second_env.world.snapshot() == second_snapshot
+    assert load_level.compile_level(load_level.level_file("coop_test")) == compiled_level
@@ -0,0 +1,126 @@
+from cooking_zoo.cooking_agents.cooking_agent import CookingAgent
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+from cooking_zoo.environment.feature_vector import FeatureVectorBuilder
+from cooking_zoo.environment.tensor_observation import TensorObservationBuilder
+
+import numpy as np
+import random
+import pickle
+import copy
+import pytest
+
+
+NUM_STEPS = 200
+RECIPE_NAMES = ["TomatoLettuceSalad", "CarrotBanana"]
+BUILDERS = {"feature_vector": lambda env: env.feature_vector_builder.agent_views(env.world),
+            "full": lambda env: env.tensor_observation_builder.observation(env.world)}
+REBUILT = {"feature_vector": lambda env: FeatureVectorBuilder(env.world.meta_object_information).agent_views(env.world),
+           "full": lambda env: TensorObservationBuilder().observation(env.world)}
+
+
+@pytest.mark.parametrize("level", ["coop_test", "switch_test"])
+@pytest.mark.parametrize("obs_space", ["feature_vector", "full"])
+def test_incremental_observation_matches_rebuilt_observation(obs_space, level):
+    # heuristic agents move items into and out of appliances, random actions, snapshots and resets mix things up
+    random.seed(0)
+    np.random.seed(0)
+    rng = np.random.RandomState(0)
+    env = CookingEnvironment(level, "example", len(RECIPE_NAMES), 100, RECIPE_NAMES, action_scheme="scheme3",
+                             obs_spaces=[obs_space] * len(RECIPE_NAMES))
+    env.reset()
+    cooking_agents = [CookingAgent(name, f"agent-{idx + 1}") for idx, name in enumerate(RECIPE_NAMES)]
+    kept = []
+    snapshot = None
+    for t in range(3 * NUM_STEPS):
+        if t % 100 == 30:
+            snapshot = env.snapshot()
+        elif t % 100 == 70:
+            env.restore(snapshot)
+        elif t % 200 == 199:
+            env.reset(options={"full_reset": False})
+        else:
+            actions = [cooking_agent.step(env.get_symbolic_view()) if rng.random_sample() < 0.8 else rng.randint(5)
+                       for cooking_agent in cooking_agents]
+            env.accumulated_step(actions)
+        if any(env.terminations.values()) or any(env.truncations.values()):
+            env.reset()
+        observation = BUILDERS[obs_space](env)
+        assert np.array_equal(observation, REBUILT[obs_space](env)), f"step {t}"
+        assert not observation.flags.writeable
+        with pytest.raises(ValueError):
+            observation[0] = 1
+        kept.append((observation, observation.copy()))
+    for observation, observation_copy in kept:
+        assert np.array_equal(observation, observation_copy)
+
+
+def test_full_observation_is_not_changed_by_later_steps():
+    # heuristic agents complete recipe nodes, so that the goal vector of the recipe changes during the episode
+    random.seed(0)
+    np.random.seed(0)
+    env = CookingEnvironment("coop_test", "example", len(RECIPE_NAMES), NUM_STEPS, RECIPE_NAMES,
+                             action_scheme="scheme3", obs_spaces=["full"] * len(RECIPE_NAMES))
+    env.reset()
+    cooking_agents = [CookingAgent(name, f"agent-{idx + 1}") for idx, name in enumerate(RECIPE_NAMES)]
+    kept = []
+    goals_changed = False
+    for _ in range(NUM_STEPS - 1):
+        observations = [env.observe(agent) for agent in env.possible_agents]
+        kept.append((observations, [{key: value.copy() for key, value in obs.items()} for obs in observations]))
+        actions = [cooking_agent.step(env.get_symbolic_view()) for cooking_agent in cooking_agents]
+        env.accumulated_step(actions)
+        if any(env.terminations.values()):
+            break
+        goals_changed |= any(not np.array_equal(env.observe(agent)["goal_vector"], obs["goal_vector"])
+                             for agent, obs in zip(env.possible_agents, observations))
+    assert goals_changed
+    for observations, copies in kept:
+        for obs, obs_copy in zip(observations, copies):
+            for key, value in obs.items():
+                assert np.array_equal(value, obs_copy[key]), key
+
+
+def symbolic_state(view):
+    return {type_name: [(type(obj).__name__, obj.location, len(getattr(obj, "_content", None) or ()))
+                        for obj in objects] for type_name, objects in view.items()}
+
+
+def test_agents_share_one_read_only_symbolic_view_per_step():
+    # heuristic agents pick the same actions on the shared view as on their own mutable copies of the objects
+    random.seed(0)
+    np.random.seed(0)
+    envs = [CookingEnvironment("switch_test", "example", len(RECIPE_NAMES), NUM_STEPS, RECIPE_NAMES,
+                               action_scheme="scheme3", obs_spaces=["symbolic"] * len(RECIPE_NAMES),
+                               mutable_symbolic_obs=mutable) for mutable in (False, True)]
+    for env in envs:
+        random.seed(0)
+        env.reset()
+    shared_env, mutable_env = envs
+    agents = {env: [CookingAgent(name, f"agent-{idx + 1}") for idx, name in enumerate(RECIPE_NAMES)] for env in envs}
+    kept = []
+    for t in range(NUM_STEPS - 1):
+        views = [shared_env.observe(agent) for agent in shared_env.possible_agents]
+        assert all(view is views[0] for view in views)
+        view = views[0]
+        with pytest.raises(TypeError):
+            view["Floor"] = ()
+        with pytest.raises(AttributeError):
+            view["Agent"][0].location = (0, 0)
+        assert copy.deepcopy(view) is view
+        assert symbolic_state(pickle.loads(pickle.dumps(view))) == symbolic_state(view)
+        kept.append((view, symbolic_state(view)))
+
+        mutable_views = [mutable_env.observe(agent) for agent in mutable_env.possible_agents]
+        assert mutable_views[0] is not mutable_views[1]
+        assert symbolic_state(mutable_views[0]) == symbolic_state(view)
+        actions = [cooking_agent.step(view) for cooking_agent in agents[shared_env]]
+        assert actions == [cooking_agent.step(mutable_view)
+                           for cooking_agent, mutable_view in zip(agents[mutable_env], mutable_views)], f"step {t}"
+        mutable_views[0]["Agent"][0].location = (0, 0)
+        assert mutable_views[1]["Agent"][0].location != (0, 0)
+        for env in envs:
+            env.accumulated_step(actions)
+        if any(shared_env.terminations.values()):
+            break
+    for view, state in kept:
+        assert symbolic_state(view) == state
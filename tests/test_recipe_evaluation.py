@@ -0,0 +1,82 @@
+from cooking_zoo.cooking_agents.cooking_agent import CookingAgent
+from cooking_zoo.cooking_book.recipe_drawer import RECIPES
+from cooking_zoo.cooking_world.actions import ActionScheme1, ActionScheme3
+from cooking_zoo.cooking_world.cooking_world import CookingWorld
+from cooking_zoo.environment.cooking_env import CookingEnvironment
+
+import numpy as np
+import random
+import pytest
+
+
+LEVELS = ["coop_test", "switch_test", "coexistence_test"]
+RECIPE_NAMES = [name for name in RECIPES if name != "no_recipe"]
+NUM_STEPS = 400
+
+
+def assert_matches_full_evaluation(name, recipe, world):
+    # a fresh recipe knows nothing about earlier steps and evaluates every node
+    reference = RECIPES[name]()
+    reference.evaluate_all_nodes(world)
+    assert [node.marked for node in recipe.node_list] == [node.marked for node in reference.node_list]
+    assert np.array_equal(recipe.goals_completed(recipe.num_goals), reference.goals_completed(reference.num_goals))
+    assert recipe.num_open_goals == reference.num_open_goals
+
+
+@pytest.mark.parametrize("action_scheme", [ActionScheme1, ActionScheme3])
+@pytest.mark.parametrize("level", LEVELS)
+def test_incremental_evaluation_matches_full_evaluation(level, action_scheme):
+    random.seed(0)
+    np.random.seed(0)
+    rng = np.random.RandomState(0)
+    world = CookingWorld(action_scheme, "example")
+    world.load_level(level, 2)
+    recipes = {name: RECIPES[name]() for name in RECIPE_NAMES}
+    snapshot = None
+    for t in range(NUM_STEPS):
+        if t % 100 == 99:
+            world.load_level(level, 2)
+        elif t % 100 == 30:
+            snapshot = world.snapshot()
+        elif t % 100 == 70:
+            world.restore(snapshot)
+        else:
+            world.world_step(rng.randint(len(action_scheme.ACTIONS), size=2).tolist())
+        for name, recipe in recipes.items():
+            recipe.update_recipe_state(world)
+            assert_matches_full_evaluation(name, recipe, world)
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_shared_evaluation_in_environment_matches_full_evaluation(level):
+    # heuristic agents complete dishes, so that nodes containing other nodes are marked, random actions mix things up
+    random.seed(0)
+    np.random.seed(0)
+    rng = np.random.RandomState(0)
+    recipe_names = ["TomatoLettuceSalad", "CarrotBanana"]
+    env = CookingEnvironment(level, "example", len(recipe_names), 100, recipe_names, action_scheme="scheme3",
+                             obs_spaces=["symbolic"] * len(recipe_names), end_condition_all_dishes=True)
+    env.reset()
+    cooking_agents = [CookingAgent(name, f"agent-{idx + 1}") for idx, name in enumerate(recipe_names)]
+    # recipes updated on their own next to the shared evaluation of the environment
+    recipes = {name: RECIPES[name]() for name in RECIPE_NAMES}
+    snapshot = None
+    num_marked = 0
+    for t in range(NUM_STEPS):
+        if t % 100 == 30:
+            snapshot = env.snapshot()
+        elif t % 100 == 70:
+            env.restore(snapshot)
+        else:
+            actions = [cooking_agent.step(env.observe(agent)) if rng.random_sample() < 0.8 else rng.randint(5)
+                       for cooking_agent, agent in zip(cooking_agents, env.possible_agents)]
+            env.accumulated_step(actions)
+        if any(env.terminations.values()) or any(env.truncations.values()):
+            env.reset()
+        for name, recipe in zip(recipe_names, env.recipe_graphs):
+            assert_matches_full_evaluation(name, recipe, env.world)
+            num_marked += sum(not node.is_leaf() and node.marked for node in recipe.node_list)
+        for name, recipe in recipes.items():
+            recipe.update_recipe_state(env.world)
+            assert_matches_full_evaluation(name, recipe, env.world)
+    assert num_marked > 0
@@ -0,0 +1,78 @@
+from cooking_zoo.cooking_world.abstract_classes import StaticObject
+from cooking_zoo.cooking_world.actions import ActionScheme1, ActionScheme3
+from cooking_zoo.cooking_world.cooking_world import CookingWorld
+from cooking_zoo.cooking_world.engine.snapshot import SNAPSHOT_LAYOUTS
+
+import numpy as np
+import random
+import pytest
+
+
+LEVELS = ["coop_test", "switch_test", "coexistence_test"]
+NUM_STEPS = 1000
+BRANCH_LENGTH = 10
+
+
+def create_world(level, action_scheme):
+    random.seed(0)
+    np.random.seed(0)
+    world = CookingWorld(action_scheme, "example")
+    world.load_level(level, 2)
+    return world
+
+
+def tracker_state(world):
+    # the cells, walkable grid and index of the world, objects given by their position in a snapshot
+    all_objects = [obj for obj_list in world.world_objects.values() for obj in obj_list] + world.agents
+    index = {id(obj): idx for idx, obj in enumerate(all_objects)}
+    tracker = world.object_tracker
+    cells = {location: [index[id(obj)] for obj in cell]
+             for location, cell in list(tracker.static_cells.items()) + list(tracker.dynamic_cells.items()) if cell}
+    abstract_index = {abstract_class: sorted(index[id(obj)] for obj in objects)
+                      for abstract_class, objects in world.abstract_index.items() if objects}
+    assert all(obj.tracker is tracker for obj in all_objects[:-len(world.agents)])
+    return cells, tracker.walkable_grid.tolist(), abstract_index
+
+
+def without_unique_ids(snapshot):
+    # objects created while stepping are numbered by a counter shared by all worlds
+    objects = tuple((type_id, tuple(value for attr, value in zip(SNAPSHOT_LAYOUTS[type_id], values)
+                                    if attr != "unique_id"))
+                    for type_id, values in snapshot.objects)
+    return snapshot._replace(objects=objects)
+
+
+@pytest.mark.parametrize("action_scheme", [ActionScheme1, ActionScheme3])
+@pytest.mark.parametrize("level", LEVELS)
+def test_restore_of_snapshot_is_equal_at_every_step(level, action_scheme):
+    world = create_world(level, action_scheme)
+    reference = create_world(level, action_scheme)
+    static_objects = [obj for obj_list in world.world_objects.values() for obj in obj_list
+                      if isinstance(obj, StaticObject)]
+    actions = np.random.RandomState(0).randint(len(action_scheme.ACTIONS), size=(NUM_STEPS, 2)).tolist()
+    history = []
+    num_removing_branches = 0
+    for step, step_actions in enumerate(actions):
+        snapshot = world.snapshot()
+        world.restore(snapshot)
+        assert world.snapshot() == snapshot, f"step {step}"
+        assert tracker_state(world) == tracker_state(reference), f"step {step}"
+        history.append(snapshot)
+        if step >= BRANCH_LENGTH and step % BRANCH_LENGTH == 0:
+            # go back to an earlier state, replaying the steps since then has to reach the same states again, objects
+            # created in between (chopping bread creates a bread) are removed and created again
+            num_removing_branches += sum(history[step - BRANCH_LENGTH].type_counts) < sum(snapshot.type_counts)
+            world.restore(history[step - BRANCH_LENGTH])
+            for branch_step in range(step - BRANCH_LENGTH, step):
+                world.world_step(actions[branch_step])
+                assert without_unique_ids(world.snapshot()) == without_unique_ids(history[branch_step + 1]), \
+                    f"step {step} replayed step {branch_step}"
+            assert tracker_state(world) == tracker_state(reference), f"step {step}"
+        world.world_step(step_actions)
+        reference.world_step(step_actions)
+        assert without_unique_ids(world.snapshot()) == without_unique_ids(reference.snapshot()), f"step {step}"
+    # static objects were restored in place
+    assert static_objects == [obj for obj_list in world.world_objects.values() for obj in obj_list
+                              if isinstance(obj, StaticObject)]
+    if level == "coop_test":
+        assert num_removing_branches > 0
@@ -0,0 +1,45 @@
+from cooking_zoo.environment.subproc_vector_env import SubprocVectorCookingEnv
+from cooking_zoo.environment.vector_env import VectorCookingEnv
+
+import numpy as np
+import pytest
+
+
+NUM_ENVS = 4
+NUM_AGENTS = 2
+MAX_STEPS = 60
+ENV_KWARGS = dict(level="coop_test", meta_file="example", num_agents=NUM_AGENTS, max_steps=MAX_STEPS,
+                  recipes=["TomatoLettuceSalad", "CarrotBanana"], action_scheme="scheme3",
+                  reward_scheme={"recipe_reward": 20, "max_time_penalty": -5, "recipe_penalty": -40,
+                                 "recipe_node_reward": 1})
+
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_subprocess_and_vector_env_return_the_same_outputs(seed):
+    vector_env = VectorCookingEnv(NUM_ENVS, obs_space="feature_vector", **ENV_KWARGS)
+    subproc_env = SubprocVectorCookingEnv(NUM_ENVS, num_workers=2, **ENV_KWARGS)
+    try:
+        vector_observations, _ = vector_env.reset(seed=seed)
+        subproc_observations, _ = subproc_env.reset(seed=seed)
+        assert np.array_equal(vector_observations, subproc_observations)
+        actions = np.random.RandomState(seed).randint(vector_env.single_action_space.n,
+                                                      size=(MAX_STEPS, NUM_ENVS, NUM_AGENTS))
+        # worlds reset automatically draw from the generators of their process, which are no longer seeded per world
+        for step_actions in actions:
+            *vector_outputs, vector_infos = vector_env.step(step_actions)
+            *subproc_outputs, subproc_infos = subproc_env.step(step_actions)
+            for vector_output, subproc_output in zip(vector_outputs[1:], subproc_outputs[1:]):
+                assert np.array_equal(vector_output, subproc_output)
+            finished = [idx for idx, infos in enumerate(vector_infos) if "final_observation" in infos]
+            assert finished == np.flatnonzero(subproc_infos.get("_final_observation", [])).tolist()
+            if finished:
+                for idx in finished:
+                    assert np.array_equal(vector_infos[idx]["final_observation"],
+                                          subproc_infos["final_observation"][idx])
+                break
+            assert np.array_equal(vector_outputs[0], subproc_outputs[0])
+        else:
+            pytest.fail("no world finished its episode")
+    finally:
+        vector_env.close()
+        subproc_env.close()